@@ -65,7 +65,8 @@ setup(
     keywords="utilities, development",
     package_dir={"": "src"},
     packages=find_packages(where="src"),
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=["Flask>=1.0.4", "schematics>=2.1.0"],
+    extras_require={"gevent": ["gevent>=20.12"]},
     cmdclass={"verify": VerifyVersionCommand},
 )
@@ -1,17 +1,46 @@
 import ast
-import ssl
+import atexit
+import concurrent.futures
+import functools
+import importlib
 import logging
-import xmlrpc.client
+import random
+import threading
 
 from flask import _app_ctx_stack, current_app
 
-from .model import make_model_base
-from . import types
+from .pool import ProxyPool
+from .profiling import Profile, current_profile, phase
+from .routing import PRIMARY, Node, NodeSet
+from .tenant import Tenant, TenantRegistry
 
 __version__ = "0.4.2"
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies are only imported on first access (PEP 562), which
+# keeps `import flask_odoo` cheap for CLI and serverless entry points.
+_LAZY_ATTRIBUTES = {
+    "LocalBus": ".bus",
+    "make_model_base": ".model",
+    "JsonlSpool": ".writebehind",
+    "WriteBehindQueue": ".writebehind",
+}
+_LAZY_SUBMODULES = ["bus", "model", "types", "writebehind"]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        return getattr(module, name)
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES) + _LAZY_SUBMODULES)
+
 
 class Odoo:
     """Stores Odoo XML-RPC server proxies and authentication information
@@ -21,22 +50,83 @@ class Odoo:
 
     def __init__(self, app=None):
         self.app = app
-        self.Model = make_model_base(self)
-        for name in types.__all__:
-            setattr(self, name, getattr(types, name))
+        self._tenant_loader = None
+        self._profile_handlers = []
+        self._change_callbacks = []
+        self._lock = threading.Lock()
 
         if self.app is not None:
             self.init_app(app)
 
+    def __getattr__(self, name):
+        # `Model`, `Attachment` and the field types are created on first
+        # access, so that schematics is only imported by apps that use them.
+        if name == "Model":
+            from . import make_model_base
+
+            with self._lock:
+                if "Model" not in self.__dict__:
+                    self.Model = make_model_base(self)
+            return self.Model
+        if name == "Attachment":
+            from .attachment import make_attachment_model
+
+            Attachment = make_attachment_model(self)
+            with self._lock:
+                self.__dict__.setdefault("Attachment", Attachment)
+            return self.Attachment
+        if name.endswith("Type"):
+            from . import types
+
+            if name in types.__all__:
+                return getattr(types, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
     def init_app(self, app):
         app.config.setdefault("ODOO_URL", "")
         app.config.setdefault("ODOO_DB", "")
         app.config.setdefault("ODOO_USERNAME", "")
         app.config.setdefault("ODOO_PASSWORD", "")
         app.config.setdefault("USE_UNVERIFIED_SSL_CONTEXT", "False")
+        app.config.setdefault("ODOO_GZIP_RESPONSES", True)
+        app.config.setdefault("ODOO_GZIP_REQUEST_THRESHOLD", None)
+        app.config.setdefault("ODOO_CONCURRENCY", "threads")
+        app.config.setdefault("ODOO_POOL_SIZE", 10)
+        app.config.setdefault("ODOO_SPAWN_LIMIT", 10)
+        app.config.setdefault("ODOO_NODES", [])
+        app.config.setdefault("ODOO_NODE_POOL_SIZE", 10)
+        app.config.setdefault("ODOO_NODE_MAX_FAILURES", 3)
+        app.config.setdefault("ODOO_NODE_EJECT_SECONDS", 30.0)
+        app.config.setdefault("ODOO_TENANT_CACHE_SIZE", 100)
+        app.config.setdefault("ODOO_TENANT_POOL_SIZE", 10)
+        app.config.setdefault("ODOO_WRITE_BEHIND_MAXSIZE", 1000)
+        app.config.setdefault("ODOO_WRITE_BEHIND_WORKERS", 1)
+        app.config.setdefault("ODOO_WRITE_BEHIND_BATCH_SIZE", 100)
+        app.config.setdefault("ODOO_WRITE_BEHIND_SPOOL", None)
+        app.config.setdefault("ODOO_WRITE_BEHIND_SHUTDOWN_TIMEOUT", 30.0)
+        app.config.setdefault("ODOO_BULK_CHUNK_SIZE", 1000)
+        app.config.setdefault("ODOO_BULK_WORKERS", 1)
+        app.config.setdefault("ODOO_PROFILE_SAMPLE_RATE", 0.0)
+        app.config.setdefault("ODOO_PROFILE_SERVER_TIMING", True)
+        app.config.setdefault("ODOO_BUS_CHANNELS", [])
+        app.config.setdefault("ODOO_BUS_WATCH_MODELS", [])
+        app.config.setdefault("ODOO_BUS_POLL_INTERVAL", 5.0)
+        app.config.setdefault("ODOO_NAME_INDEX_TTL", 60.0)
+        app.config.setdefault("ODOO_NAME_INDEX_PAGE_SIZE", 1000)
+        app.extensions["odoo"] = {}
 
+        app.before_request(self._sample_profile)
+        app.after_request(self._export_profile)
         app.teardown_appcontext(self.teardown)
 
+        if (
+            app.config["ODOO_BUS_CHANNELS"]
+            or app.config["ODOO_BUS_WATCH_MODELS"]
+        ):
+            self.start_listener(app)
+
     def teardown(self, exception):
         ctx = _app_ctx_stack.top
         for name in ["odoo_common", "odoo_object"]:
@@ -44,20 +134,56 @@ class Odoo:
             if server_proxy:
                 server_proxy._ServerProxy__close()
                 delattr(ctx, name)
-        if hasattr(ctx, "odoo_uid"):
-            delattr(ctx, "odoo_uid")
+        for name in [
+            "odoo_uid",
+            "odoo_tenants",
+            "odoo_profile",
+            "odoo_pooled",
+        ]:
+            if hasattr(ctx, name):
+                delattr(ctx, name)
 
-    def create_common_proxy(self):
-        url = current_app.config["ODOO_URL"]
-        use_unverified_ssl_context = ast.literal_eval(
+    @property
+    def cooperative(self):
+        """Whether calls are made with gevent sockets and greenlet-safe
+        connection pools, see `ODOO_CONCURRENCY`.
+        """
+        return current_app.config["ODOO_CONCURRENCY"] == "gevent"
+
+    def create_ssl_context(self):
+        unverified = ast.literal_eval(
             current_app.config["USE_UNVERIFIED_SSL_CONTEXT"]
         )
-        if use_unverified_ssl_context:
-            return xmlrpc.client.ServerProxy(
-                f"{url}/xmlrpc/2/common",
-                context=ssl._create_unverified_context(),
-            )
-        return xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/common")
+        if self.cooperative:
+            from .cooperative import create_ssl_context
+
+            # The transport's default context would wrap sockets with the
+            # blocking `ssl` module.
+            return create_ssl_context(verify=not unverified)
+        import ssl
+
+        if unverified:
+            return ssl._create_unverified_context()
+        return None
+
+    def create_transport(self, url: str):
+        from .transport import create_transport
+
+        return create_transport(
+            url,
+            context=self.create_ssl_context(),
+            accept_gzip=current_app.config["ODOO_GZIP_RESPONSES"],
+            gzip_threshold=current_app.config["ODOO_GZIP_REQUEST_THRESHOLD"],
+            cooperative=self.cooperative,
+        )
+
+    def create_common_proxy(self, url: str = None):
+        import xmlrpc.client
+
+        url = url or self.url
+        return xmlrpc.client.ServerProxy(
+            f"{url}/xmlrpc/2/common", transport=self.create_transport(url)
+        )
 
     @property
     def common(self):
@@ -67,12 +193,24 @@ class Odoo:
                 ctx.odoo_common = self.create_common_proxy()
             return ctx.odoo_common
 
+    @property
+    def url(self):
+        """Base URL used for authentication and unrouted calls.
+
+        Falls back to the first primary node when `ODOO_URL` is empty.
+        """
+        url = current_app.config["ODOO_URL"]
+        if not url and self.nodes is not None:
+            url = self.nodes.primaries[0].url
+        return url
+
     def authenticate(self):
         """Returns a user identifier (uid) used in authenticated calls."""
         db = current_app.config["ODOO_DB"]
         username = current_app.config["ODOO_USERNAME"]
         password = current_app.config["ODOO_PASSWORD"]
-        uid = self.common.authenticate(db, username, password, {})
+        with phase("authenticate"):
+            uid = self.common.authenticate(db, username, password, {})
         return uid
 
     @property
@@ -83,9 +221,13 @@ class Odoo:
                 ctx.odoo_uid = self.authenticate()
             return ctx.odoo_uid
 
-    def create_object_proxy(self):
-        url = current_app.config["ODOO_URL"]
-        object = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object")
+    def create_object_proxy(self, url: str = None):
+        import xmlrpc.client
+
+        url = url or self.url
+        object = xmlrpc.client.ServerProxy(
+            f"{url}/xmlrpc/2/object", transport=self.create_transport(url)
+        )
         return object
 
     @property
@@ -96,6 +238,437 @@ class Odoo:
                 ctx.odoo_object = self.create_object_proxy()
             return ctx.odoo_object
 
+    def create_nodes(self):
+        """Returns a `NodeSet` built from the `ODOO_NODES` config.
+
+        Each entry is either a URL of a primary node or a dict with `url`
+        and `role` keys, where role is `"primary"` or `"replica"`.
+        """
+        config = current_app.config
+        nodes = []
+        for entry in config["ODOO_NODES"]:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            url = entry["url"]
+            pool = self.create_pool(
+                functools.partial(self.create_object_proxy, url),
+                maxsize=config["ODOO_NODE_POOL_SIZE"],
+            )
+            nodes.append(
+                Node(
+                    url,
+                    role=entry.get("role", PRIMARY),
+                    pool=pool,
+                    max_failures=config["ODOO_NODE_MAX_FAILURES"],
+                    eject_seconds=config["ODOO_NODE_EJECT_SECONDS"],
+                )
+            )
+        return NodeSet(nodes)
+
+    def create_pool(self, factory, maxsize: int):
+        """Returns a `ProxyPool`, greenlet-safe in cooperative mode."""
+        if self.cooperative:
+            from .cooperative import lifo_queue
+
+            return ProxyPool(factory, maxsize, queue_factory=lifo_queue)
+        return ProxyPool(factory, maxsize)
+
+    def create_lock(self):
+        """Returns a lock for sections that make Odoo calls, greenlet-aware
+        in cooperative mode.
+        """
+        if self.cooperative:
+            from .cooperative import create_lock
+
+            return create_lock()
+        return threading.Lock()
+
+    @property
+    def pool(self):
+        """The app's `ProxyPool` for `ODOO_URL`, used instead of the proxy
+        of the application context in cooperative mode and by `spawn_many`.
+        """
+
+        def factory():
+            return self.create_pool(
+                self.create_object_proxy,
+                maxsize=current_app.config["ODOO_POOL_SIZE"],
+            )
+
+        return self._get_state("pool", factory)
+
+    def _get_state(self, name: str, factory):
+        """Returns app-wide state kept in `app.extensions`, creating it with
+        `factory` on first use.
+        """
+        state = current_app.extensions.setdefault("odoo", {})
+        if name not in state:
+            with self._lock:
+                if name not in state:
+                    state[name] = factory()
+        return state[name]
+
+    @property
+    def nodes(self):
+        """Returns the app's `NodeSet` or `None` if no nodes are configured."""
+
+        def factory():
+            if current_app.config.get("ODOO_NODES"):
+                return self.create_nodes()
+            return None
+
+        return self._get_state("nodes", factory)
+
+    def check_nodes(self):
+        """Calls `common.version` on every node, ejecting failing ones and
+        bringing recovered ones back into rotation.
+        """
+
+        def version(node):
+            common = self.create_common_proxy(node.url)
+            try:
+                return common.version()
+            finally:
+                common._ServerProxy__close()
+
+        if self.nodes is not None:
+            self.nodes.check_health(version)
+
+    @property
+    def tenants(self):
+        def factory():
+            return TenantRegistry(
+                self.create_tenant,
+                maxsize=current_app.config["ODOO_TENANT_CACHE_SIZE"],
+            )
+
+        return self._get_state("tenants", factory)
+
+    def create_tenant(self, db: str, username: str, password: str):
+        return Tenant(
+            self,
+            db,
+            username,
+            password,
+            pool_size=current_app.config["ODOO_TENANT_POOL_SIZE"],
+            lock_factory=self.create_lock,
+        )
+
+    def for_tenant(self, db: str, username: str, password: str):
+        """Returns the cached `Tenant` for the given database and user."""
+        tenant = self.tenants.get(db, username, password)
+        queue = current_app.extensions.get("odoo", {}).get("write_behind")
+        if queue is not None:
+            # Spooled writes of the tenant are applied once it is known.
+            queue.resume_parked()
+        return tenant
+
+    def tenant_loader(self, callback):
+        """Registers a callback returning the `Tenant` to use when none is
+        bound to the current application context, e.g. one picked from the
+        request's host name. The callback may return `None` to fall back to
+        the app config.
+        """
+        self._tenant_loader = callback
+        return callback
+
+    @property
+    def tenant(self):
+        """The `Tenant` bound to the current application context, if any."""
+        ctx = _app_ctx_stack.top
+        if ctx is None:
+            return None
+        tenants = getattr(ctx, "odoo_tenants", None)
+        if tenants:
+            return tenants[-1]
+        if self._tenant_loader is not None:
+            tenant = self._tenant_loader()
+            if tenant is not None:
+                ctx.odoo_tenants = [tenant]
+            return tenant
+        return None
+
+    def wrap_context(self, function):
+        """Returns `function` wrapped to run in a new application context
+        with the current tenant bound, for use in worker threads.
+        """
+        app = current_app._get_current_object()
+        tenant = self.tenant
+        uid = getattr(_app_ctx_stack.top, "odoo_uid", None)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with app.app_context():
+                if uid is not None:
+                    _app_ctx_stack.top.odoo_uid = uid
+                if tenant is None:
+                    return function(*args, **kwargs)
+                with tenant:
+                    return function(*args, **kwargs)
+
+        return wrapper
+
+    def credentials(self):
+        """Returns the `(db, uid, password)` used in authenticated calls,
+        taken from the current tenant or the app config.
+        """
+        tenant = self.tenant
+        if tenant is not None:
+            return tenant.db, tenant.uid, tenant.password
+        db = current_app.config["ODOO_DB"]
+        password = current_app.config["ODOO_PASSWORD"]
+        return db, self.uid, password
+
+    def execute_kw(self, model_name: str, method: str, args, kwargs):
+        """Calls a method of an Odoo model via the `execute_kw` RPC function.
+
+        When `ODOO_NODES` is configured the call is routed to the least busy
+        available node suitable for `method`. When a tenant is bound the call
+        uses its credentials and connection pools.
+        """
+        params = self.credentials() + (model_name, method, args, kwargs)
+        tenant = self.tenant
+        nodes = self.nodes
+        if tenant is None:
+            if nodes is None:
+                if not self._pooled():
+                    return self.object.execute_kw(*params)
+                with self.pool.connection() as object:
+                    return object.execute_kw(*params)
+            node = nodes.pick(method)
+            return self._call_node(node, node.pool, params)
+        with tenant.metrics.measure():
+            if nodes is None:
+                with tenant.pool(self.url).connection() as object:
+                    return object.execute_kw(*params)
+            node = nodes.pick(method)
+            return self._call_node(node, tenant.pool(node.url), params)
+
+    def _pooled(self):
+        # Greenlets of a request share its application context, and with it
+        # the context's proxy, so pooled proxies are used instead.
+        ctx = _app_ctx_stack.top
+        return self.cooperative or getattr(ctx, "odoo_pooled", False)
+
+    def spawn_many(self, calls, limit: int = None):
+        """Runs many `execute_kw` calls concurrently and returns their
+        results in order.
+
+        Calls run in greenlets in cooperative mode and in threads otherwise,
+        at most `limit` (`ODOO_SPAWN_LIMIT` by default) at a time, with
+        connections taken from the app's pools.
+
+        Args:
+            calls: Iterable of `(model_name, method, args)` or
+                `(model_name, method, args, kwargs)` tuples.
+            limit: Maximum number of concurrent calls.
+
+        Examples:
+            >>> odoo.spawn_many([
+            ...     ("res.partner", "search_count", ([],)),
+            ...     ("res.country", "search_count", ([],)),
+            ... ])
+            [42, 250]
+
+        """
+        limit = limit or current_app.config["ODOO_SPAWN_LIMIT"]
+        # Authenticate once, the uid is passed on to the spawned calls.
+        self.credentials()
+
+        def call(model_name, method, args=(), kwargs=None):
+            _app_ctx_stack.top.odoo_pooled = True
+            return self.execute_kw(model_name, method, args, kwargs or {})
+
+        call = self.wrap_context(call)
+        functions = [functools.partial(call, *params) for params in calls]
+        if self.cooperative:
+            from .cooperative import spawn_many
+
+            return spawn_many(functions, limit)
+        with concurrent.futures.ThreadPoolExecutor(limit) as executor:
+            futures = [executor.submit(function) for function in functions]
+            return [future.result() for future in futures]
+
+    def object_url(self, method: str):
+        """Returns the URL of the object endpoint `method` is sent to."""
+        url = self.url
+        if self.nodes is not None:
+            url = self.nodes.pick(method).url
+        return f"{url}/xmlrpc/2/object"
+
+    def stream_kw(self, model_name: str, method: str, args, kwargs):
+        """Like `execute_kw`, but returns an iterator yielding the records
+        returned by `method` as soon as they are received.
+
+        The request is only sent once iteration starts, which may happen
+        outside of the application context.
+        """
+        from .stream import stream_call
+
+        params = self.credentials() + (model_name, method, args, kwargs)
+        return stream_call(
+            self.object_url(method),
+            "execute_kw",
+            params,
+            context=self.create_ssl_context(),
+            accept_gzip=current_app.config["ODOO_GZIP_RESPONSES"],
+            gzip_threshold=current_app.config["ODOO_GZIP_REQUEST_THRESHOLD"],
+            cooperative=self.cooperative,
+        )
+
+    def _call_node(self, node, pool, params):
+        import http.client
+        import xmlrpc.client
+
+        with node.track():
+            try:
+                with pool.connection() as object:
+                    result = object.execute_kw(*params)
+            except (
+                OSError,
+                http.client.HTTPException,
+                xmlrpc.client.ProtocolError,
+            ):
+                node.mark_failure()
+                raise
+        node.mark_success()
+        return result
+
+    def create_write_behind(self):
+        from .writebehind import JsonlSpool, WriteBehindQueue
+
+        config = current_app.config
+        spool = None
+        if config["ODOO_WRITE_BEHIND_SPOOL"]:
+            spool = JsonlSpool(config["ODOO_WRITE_BEHIND_SPOOL"])
+        queue = WriteBehindQueue(
+            self,
+            current_app._get_current_object(),
+            maxsize=config["ODOO_WRITE_BEHIND_MAXSIZE"],
+            workers=config["ODOO_WRITE_BEHIND_WORKERS"],
+            batch_size=config["ODOO_WRITE_BEHIND_BATCH_SIZE"],
+            spool=spool,
+        )
+        atexit.register(
+            queue.shutdown, config["ODOO_WRITE_BEHIND_SHUTDOWN_TIMEOUT"]
+        )
+        return queue
+
+    @property
+    def write_behind(self):
+        """The app's `WriteBehindQueue`, started on first use."""
+        return self._get_state("write_behind", self.create_write_behind)
+
+    def enqueue(self, model_name: str, id: int, vals: dict, callback=None):
+        """Queues a `write` (or a `create` when `id` is falsy) to be applied
+        in the background with the credentials of the current tenant.
+        """
+        self.write_behind.enqueue(
+            model_name, id, vals, tenant=self.tenant, callback=callback
+        )
+
+    def flush(self, timeout: float = None):
+        """Blocks until all queued writes have been applied."""
+        state = current_app.extensions.get("odoo", {})
+        if "write_behind" not in state:
+            return True
+        return state["write_behind"].flush(timeout)
+
+    def start_profile(self):
+        """Starts profiling the Odoo calls of the current request and
+        returns its `Profile`.
+        """
+        ctx = _app_ctx_stack.top
+        if getattr(ctx, "odoo_profile", None) is None:
+            ctx.odoo_profile = Profile()
+        return ctx.odoo_profile
+
+    def profile_handler(self, callback):
+        """Registers a callback called with the `Profile` of every profiled
+        request, e.g. to log its collapsed stacks.
+        """
+        self._profile_handlers.append(callback)
+        return callback
+
+    def _sample_profile(self):
+        rate = current_app.config["ODOO_PROFILE_SAMPLE_RATE"]
+        if rate and random.random() < rate:
+            self.start_profile()
+
+    def _export_profile(self, response):
+        profile = current_profile()
+        if profile is None or not profile.totals:
+            return response
+        if current_app.config["ODOO_PROFILE_SERVER_TIMING"]:
+            server_timing = profile.server_timing()
+            if server_timing:
+                response.headers.add("Server-Timing", server_timing)
+        for callback in self._profile_handlers:
+            callback(profile)
+        return response
+
+    def on_change(self, model_name: str = None):
+        """Registers a callback called with `(model_name, ids)` when records
+        of `model_name`, or of any model if `None`, change in Odoo.
+
+        Examples:
+            >>> @odoo.on_change("res.country")
+            ... def invalidate_countries(model_name, ids):
+            ...     cache.delete_many(*ids)
+
+        """
+
+        def decorator(callback):
+            self._change_callbacks.append((model_name, callback))
+            return callback
+
+        return decorator
+
+    def publish(self, model_name: str, ids: list):
+        """Calls the callbacks registered for changes of `model_name`."""
+        for name, callback in list(self._change_callbacks):
+            if name is not None and name != model_name:
+                continue
+            try:
+                callback(model_name, ids)
+            except Exception:
+                logger.exception("Change callback %r failed", callback)
+
+    def create_bus_sources(self, config):
+        from .bus import OdooBus, WriteDatePoller
+
+        sources = []
+        if config["ODOO_BUS_CHANNELS"]:
+            sources.append(OdooBus(self, config["ODOO_BUS_CHANNELS"]))
+        if config["ODOO_BUS_WATCH_MODELS"]:
+            sources.append(
+                WriteDatePoller(self, config["ODOO_BUS_WATCH_MODELS"])
+            )
+        return sources
+
+    def start_listener(self, app=None, sources: list = None):
+        """Starts the app's `BusListener` if it is not running and returns
+        it. Sources are created from the `ODOO_BUS_*` config by default.
+        """
+        from .bus import BusListener
+
+        app = app or current_app._get_current_object()
+        state = app.extensions["odoo"]
+        with self._lock:
+            if "listener" not in state:
+                if sources is None:
+                    sources = self.create_bus_sources(app.config)
+                listener = BusListener(
+                    self,
+                    app,
+                    sources,
+                    interval=app.config["ODOO_BUS_POLL_INTERVAL"],
+                )
+                listener.start()
+                atexit.register(listener.stop)
+                state["listener"] = listener
+            return state["listener"]
+
     def __getitem__(self, key):
         return ObjectProxy(self, key)
 
@@ -121,16 +694,17 @@ class ObjectProxy:
             self.name = name
 
         def __call__(self, *args, **kwargs):
-            db = current_app.config["ODOO_DB"]
-            password = current_app.config["ODOO_PASSWORD"]
-            return self.odoo.object.execute_kw(
-                db,
-                self.odoo.uid,
-                password,
-                self.model_name,
-                self.name,
-                args,
-                kwargs,
+            with phase(f"{self.model_name}.{self.name}"):
+                return self.odoo.execute_kw(
+                    self.model_name, self.name, args, kwargs
+                )
+
+        def stream(self, *args, **kwargs):
+            """Calls the method and returns an iterator over the records it
+            returns, parsed while the response is being received.
+            """
+            return self.odoo.stream_kw(
+                self.model_name, self.name, args, kwargs
             )
 
         def __repr__(self):
@@ -0,0 +1,269 @@
+import base64
+import io
+import os
+import tempfile
+import uuid
+import xmlrpc.client
+from xml.parsers import expat
+
+from flask import current_app
+
+from .stream import create_connection, iter_response, post
+from .transport import GzipDecoder
+from .types import IntType, StringType
+
+CHUNK_SIZE = 64 * 1024
+# A multiple of 3 bytes, so that encoded chunks can be concatenated.
+ENCODE_CHUNK_SIZE = 3 * 16 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+
+class Base64Decoder:
+    """Incrementally decodes base64 text received in arbitrary chunks."""
+
+    def __init__(self):
+        self._rest = ""
+
+    def decode(self, text: str):
+        data = self._rest + "".join(text.split())
+        end = len(data) - len(data) % 4
+        self._rest = data[end:]
+        return base64.b64decode(data[:end])
+
+    def flush(self):
+        if self._rest:
+            raise ValueError("Truncated base64 data.")
+        return b""
+
+
+def iter_base64(fileobj, chunk_size: int = ENCODE_CHUNK_SIZE):
+    """Yields the content of `fileobj` base64 encoded, chunk by chunk.
+
+    Reads may return fewer bytes than asked for, data is buffered up to a
+    multiple of 3 bytes so that no padding ends up mid-stream.
+    """
+    rest = b""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        data = rest + chunk
+        end = len(data) - len(data) % 3
+        rest = data[end:]
+        if end:
+            yield base64.b64encode(data[:end])
+    if rest:
+        yield base64.b64encode(rest)
+
+
+class BinaryFieldHandler:
+    """Expat handler that writes the value of one binary field straight to
+    a file while the rest of the response goes to a regular unmarshaller.
+
+    Args:
+        field: Name of the binary field.
+        fileobj: Binary file the decoded content is written to.
+
+    """
+
+    def __init__(self, field: str, fileobj):
+        self.field = field
+        self.fileobj = fileobj
+        self.unmarshaller = xmlrpc.client.Unmarshaller()
+        self.decoder = Base64Decoder()
+        self.capturing = False
+        self._name = None
+        self._member = None
+
+    def start(self, tag, attrs):
+        if tag == "name":
+            self._name = []
+        elif tag in ("string", "base64") and self._member == self.field:
+            # The unmarshalled result gets an empty value instead.
+            self.capturing = True
+        self.unmarshaller.start(tag, attrs)
+
+    def data(self, text):
+        if self.capturing:
+            self.fileobj.write(self.decoder.decode(text))
+            return
+        if self._name is not None:
+            self._name.append(text)
+        self.unmarshaller.data(text)
+
+    def end(self, tag):
+        if tag == "name":
+            self._member = "".join(self._name)
+            self._name = None
+        elif tag == "member":
+            self._member = None
+        if self.capturing and tag in ("string", "base64"):
+            self.capturing = False
+            self.fileobj.write(self.decoder.flush())
+        self.unmarshaller.end(tag)
+
+    def parser(self):
+        parser = expat.ParserCreate(None, None)
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        self.unmarshaller.xml(None, None)
+        return parser
+
+
+def open_binary(
+    odoo,
+    model_name: str,
+    id: int,
+    field: str,
+    spool_size: int = SPOOL_SIZE,
+    timeout: float = None,
+    accept_gzip: bool = True,
+):
+    """Reads a binary field and returns its decoded content as a file.
+
+    The response is parsed while it is received and the base64 data decoded
+    chunk by chunk into a temporary file, which stays in memory up to
+    `spool_size` bytes. The response is requested gzip compressed when
+    `accept_gzip` is true.
+
+    Raises:
+        LookupError: The record does not exist.
+        xmlrpc.client.Fault: The server returned a fault.
+
+    """
+    params = odoo.credentials() + (model_name, "read", ([id], [field]), {})
+    body = xmlrpc.client.dumps(params, "execute_kw").encode("utf-8")
+    url = odoo.object_url("read")
+    fileobj = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    connection = create_connection(
+        url, odoo.create_ssl_context(), timeout, odoo.cooperative
+    )
+    try:
+        headers = {"Accept-Encoding": "gzip"} if accept_gzip else {}
+        response = post(connection, url, body, headers)
+        decoder = GzipDecoder(response.getheader("Content-Encoding", ""))
+        handler = BinaryFieldHandler(field, fileobj)
+        parser = handler.parser()
+        for chunk in iter_response(response, CHUNK_SIZE):
+            parser.Parse(decoder.decode(chunk), False)
+        parser.Parse(decoder.flush(), True)
+        (records,) = handler.unmarshaller.close()
+    except BaseException:
+        fileobj.close()
+        raise
+    finally:
+        connection.close()
+    if not records:
+        fileobj.close()
+        raise LookupError(f"{model_name}({id}) does not exist.")
+    fileobj.seek(0)
+    return fileobj
+
+
+def _file_size(fileobj):
+    position = fileobj.tell()
+    size = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(position)
+    return size - position
+
+
+def upload_binary(
+    odoo,
+    model_name: str,
+    fileobj,
+    field: str,
+    vals: dict = None,
+    timeout: float = None,
+):
+    """Creates a record with the content of `fileobj` in a binary field.
+
+    The request body is base64 encoded chunk by chunk while it is sent, so
+    `fileobj` must be seekable to compute its length up front.
+
+    Returns:
+        The id of the created record.
+
+    """
+    marker = uuid.uuid4().hex
+    vals = dict(vals or {}, **{field: marker})
+    params = odoo.credentials() + (model_name, "create", (vals,), {})
+    prefix, suffix = (
+        xmlrpc.client.dumps(params, "execute_kw")
+        .encode("utf-8")
+        .split(marker.encode("ascii"))
+    )
+    size = _file_size(fileobj)
+    length = len(prefix) + (size + 2) // 3 * 4 + len(suffix)
+
+    def body():
+        yield prefix
+        yield from iter_base64(fileobj)
+        yield suffix
+
+    url = odoo.object_url("create")
+    connection = create_connection(
+        url, odoo.create_ssl_context(), timeout, odoo.cooperative
+    )
+    try:
+        response = post(
+            connection, url, body(), {"Content-Length": str(length)}
+        )
+        (id,), _ = xmlrpc.client.loads(response.read())
+    finally:
+        connection.close()
+    return id
+
+
+def make_attachment_model(odoo):
+    """Return a model for `ir.attachment` with streaming content access."""
+
+    class Attachment(odoo.Model):
+        _name = "ir.attachment"
+
+        name = StringType()
+        mimetype = StringType()
+        file_size = IntType()
+        res_model = StringType()
+        res_id = IntType()
+
+        @classmethod
+        def open(cls, id: int):
+            """Returns the content of the attachment as a file object."""
+            return open_binary(
+                cls._odoo,
+                cls._model_name(),
+                id,
+                "datas",
+                accept_gzip=current_app.config["ODOO_GZIP_RESPONSES"],
+            )
+
+        @classmethod
+        def stream(cls, id: int, chunk_size: int = CHUNK_SIZE):
+            """Returns an iterator over the content of the attachment,
+            suitable for a Flask `Response`.
+            """
+            fileobj = cls.open(id)
+
+            def generate():
+                with fileobj:
+                    while True:
+                        chunk = fileobj.read(chunk_size)
+                        if not chunk:
+                            break
+                        yield chunk
+
+            return generate()
+
+        @classmethod
+        def upload(cls, fileobj, name: str, **vals):
+            """Creates an attachment from a binary file object."""
+            if isinstance(fileobj, (bytes, bytearray)):
+                fileobj = io.BytesIO(fileobj)
+            vals["name"] = name
+            id = upload_binary(
+                cls._odoo, cls._model_name(), fileobj, "datas", vals
+            )
+            return cls.search_by_id(id)
+
+    return Attachment
@@ -0,0 +1,182 @@
+import base64
+import concurrent.futures
+import datetime
+import json
+
+import schematics
+
+from .types import Many2oneType, One2manyType
+
+EXTERNAL_ID = "external_id"
+
+
+class UpsertResult:
+    """Outcome of upserting one instance with `Model.bulk_upsert`.
+
+    Args:
+        instance: The upserted model instance.
+        id: Database id of the record, `None` if the chunk failed.
+        messages: Messages returned by Odoo's `load` for this row.
+
+    """
+
+    def __init__(self, instance, id: int = None, messages: list = None):
+        self.instance = instance
+        self.id = id
+        self.messages = messages or []
+
+    @property
+    def ok(self):
+        return self.id is not None and not any(
+            message.get("type") == "error" for message in self.messages
+        )
+
+    def __repr__(self):
+        return f"<UpsertResult(id={self.id}, ok={self.ok})>"
+
+
+def _to_load_value(value):
+    # `load` parses values like an imported CSV file.
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+def load_columns(model):
+    """Returns `(field name, load column, field)` for every field of `model`
+    written by `bulk_upsert`.
+    """
+    columns = []
+    for name, field in model._schema.fields.items():
+        if name == "id" or isinstance(field, schematics.types.Serializable):
+            continue
+        key = field.serialized_name or name
+        if isinstance(field, (Many2oneType, One2manyType)):
+            key = f"{key}/.id"
+        columns.append((name, key, field))
+    return columns
+
+
+def load_row(instance, columns):
+    row = []
+    for name, key, field in columns:
+        value = instance.get(name)
+        if value is None:
+            row.append("")
+        elif isinstance(field, Many2oneType):
+            row.append(str(value[0]))
+        elif isinstance(field, One2manyType):
+            row.append(",".join(str(id) for id in value))
+        else:
+            row.append(_to_load_value(value))
+    return row
+
+
+def _match_ids(model, key: str, instances):
+    """Returns the database ids of existing records, keyed by `key` value."""
+    field = model._schema.fields[key]
+    odoo_key = field.serialized_name or key
+    values = [instance.get(key) for instance in instances]
+    values = [value for value in values if value is not None]
+    if not values:
+        return {}
+    domain = model._construct_domain([[odoo_key, "in", values]])
+    records = model._odoo[model._model_name()].search_read(
+        domain, fields=["id", odoo_key]
+    )
+    return {record[odoo_key]: record["id"] for record in records}
+
+
+def _message_rows(message, count):
+    if "record" in message:
+        return [message["record"]]
+    rows = message.get("rows")
+    if rows:
+        return range(rows["from"], rows["to"] + 1)
+    return range(count)
+
+
+def upsert_chunk(model, instances, key: str, columns):
+    """Creates or updates `instances` with a single call to `load`."""
+    fields = [column for name, column, field in columns]
+    rows = [load_row(instance, columns) for instance in instances]
+    if key == EXTERNAL_ID:
+        fields.insert(0, "id")
+        for instance, row in zip(instances, rows):
+            external_id = getattr(instance, EXTERNAL_ID, None)
+            if not external_id:
+                raise ValueError(f"{instance!r} has no external id.")
+            row.insert(0, external_id)
+    else:
+        ids = _match_ids(model, key, instances)
+        fields.insert(0, ".id")
+        for instance, row in zip(instances, rows):
+            id = ids.get(instance.get(key))
+            row.insert(0, str(id) if id else "")
+    result = model._odoo[model._model_name()].load(fields, rows)
+    messages = [[] for instance in instances]
+    for message in result.get("messages", []):
+        for index in _message_rows(message, len(instances)):
+            if 0 <= index < len(messages):
+                messages[index].append(message)
+    ids = result.get("ids") or [None] * len(instances)
+    results = []
+    for instance, id, row_messages in zip(instances, ids, messages):
+        if id:
+            instance.id = id
+        results.append(UpsertResult(instance, id or None, row_messages))
+    return results
+
+
+def bulk_upsert(
+    model,
+    instances: list,
+    key: str = EXTERNAL_ID,
+    chunk_size: int = 1000,
+    workers: int = 1,
+):
+    """Creates or updates many records through Odoo's `load` method.
+
+    Records are matched either by external id, taken from each instance's
+    `external_id` attribute (e.g. a `serializable` property), or by the
+    value of the field named by `key`.
+    Instances are sent in chunks of `chunk_size` rows, up to `workers`
+    chunks at a time. Odoo applies each chunk atomically: if any row of a
+    chunk fails, none of its rows are saved.
+
+    Returns:
+        A list of `UpsertResult`, in the order of `instances`.
+
+    Raises:
+        ValueError: An instance has no external id.
+
+    """
+    instances = list(instances)
+    columns = load_columns(model)
+    chunks = [
+        instances[start : start + chunk_size]
+        for start in range(0, len(instances), chunk_size)
+    ]
+    if workers <= 1 or len(chunks) <= 1:
+        return [
+            result
+            for chunk in chunks
+            for result in upsert_chunk(model, chunk, key, columns)
+        ]
+    upsert = model._odoo.wrap_context(upsert_chunk)
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(upsert, model, chunk, key, columns)
+            for chunk in chunks
+        ]
+        return [result for future in futures for result in future.result()]
@@ -0,0 +1,194 @@
+import collections
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBus:
+    """An in-memory stand-in for Odoo's bus, for tests and local
+    development.
+
+    Examples:
+        >>> bus = LocalBus()
+        >>> listener = odoo.start_listener(app, sources=[bus])
+        >>> bus.send("res.partner", [1, 2])
+
+    """
+
+    def __init__(self):
+        self._events = collections.deque()
+
+    def send(self, model_name: str, ids: list):
+        self._events.append((model_name, list(ids)))
+
+    def poll(self):
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+class OdooBus:
+    """Reads change notifications from Odoo's `bus.bus` model.
+
+    Messages sent on `channels` must be dicts with `model` and `ids` keys,
+    e.g. sent by an automated action with `bus.bus.sendone`. Odoo deletes
+    bus messages after a couple of minutes, so they have to be polled more
+    often than that.
+
+    Args:
+        odoo: Instance of the `Odoo` class.
+        channels: Channels to read, as passed to `bus.bus.sendone`.
+
+    """
+
+    def __init__(self, odoo, channels: list):
+        self.odoo = odoo
+        self.channels = [json.dumps(channel) for channel in channels]
+        self.last_id = None
+
+    def poll(self):
+        bus = self.odoo["bus.bus"]
+        if self.last_id is None:
+            # Start from the latest message, older ones are not replayed.
+            rows = bus.search_read([], fields=["id"], order="id desc", limit=1)
+            self.last_id = rows[0]["id"] if rows else 0
+            return []
+        rows = bus.search_read(
+            [["id", ">", self.last_id], ["channel", "in", self.channels]],
+            fields=["id", "message"],
+            order="id",
+        )
+        events = []
+        for row in rows:
+            if row["id"] <= self.last_id:
+                continue
+            self.last_id = row["id"]
+            try:
+                message = json.loads(row["message"])
+            except (TypeError, ValueError):
+                continue
+            if isinstance(message, dict) and "model" in message:
+                events.append((message["model"], list(message.get("ids", []))))
+        return events
+
+
+def _is_new(row, write_date, seen: set):
+    if not row["write_date"]:
+        return False
+    if not write_date or row["write_date"] > write_date:
+        return True
+    return row["write_date"] == write_date and row["id"] not in seen
+
+
+class WriteDatePoller:
+    """Detects changed records by polling the `write_date` of `models`.
+
+    Deleted records are not detected.
+
+    Args:
+        odoo: Instance of the `Odoo` class.
+        models: Names of the models to watch.
+
+    """
+
+    def __init__(self, odoo, models: list):
+        self.odoo = odoo
+        self.models = list(models)
+        # Maps model names to the latest write date seen and the ids of the
+        # records written at that date.
+        self.cursors = {}
+
+    def _poll_model(self, model_name: str):
+        model = self.odoo[model_name]
+        if model_name not in self.cursors:
+            rows = model.search_read(
+                [],
+                fields=["id", "write_date"],
+                order="write_date desc",
+                limit=1,
+            )
+            if rows:
+                self.cursors[model_name] = (
+                    rows[0]["write_date"],
+                    {rows[0]["id"]},
+                )
+            else:
+                self.cursors[model_name] = (False, set())
+            return []
+        write_date, seen = self.cursors[model_name]
+        domain = [["write_date", ">=", write_date]] if write_date else []
+        rows = model.search_read(
+            domain, fields=["id", "write_date"], order="write_date"
+        )
+        rows = sorted(
+            (row for row in rows if _is_new(row, write_date, seen)),
+            key=lambda row: row["write_date"],
+        )
+        if not rows:
+            return []
+        latest = rows[-1]["write_date"]
+        if latest != write_date:
+            seen = set()
+        seen |= {row["id"] for row in rows if row["write_date"] == latest}
+        self.cursors[model_name] = (latest, seen)
+        return [(model_name, [row["id"] for row in rows])]
+
+    def poll(self):
+        events = []
+        for model_name in self.models:
+            events.extend(self._poll_model(model_name))
+        return events
+
+
+class BusListener:
+    """Polls change sources in a background thread and publishes the changed
+    records with `Odoo.publish`.
+
+    Args:
+        odoo: Instance of the `Odoo` class.
+        app: Flask application the sources are polled in.
+        sources: Objects with a `poll` method returning a list of
+            `(model name, ids)` tuples, e.g. `OdooBus` or `WriteDatePoller`.
+        interval: Seconds to wait between two polls.
+
+    """
+
+    def __init__(self, odoo, app, sources: list, interval: float = 5.0):
+        self.odoo = odoo
+        self.app = app
+        self.sources = list(sources)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Polls every source once and publishes their events."""
+        for source in self.sources:
+            try:
+                events = source.poll()
+            except Exception:
+                logger.exception("Polling %r failed", source)
+                continue
+            for model_name, ids in events:
+                self.odoo.publish(model_name, ids)
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                self.poll()
+            if self._stopped.wait(self.interval):
+                break
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="odoo-bus-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,72 @@
+# Support for running Odoo calls in gevent greenlets, used when
+# `ODOO_CONCURRENCY` is set to "gevent". gevent is only imported when these
+# functions are called. Sockets are created with gevent's socket module, so
+# XML-RPC calls yield to other greenlets without monkey-patching the
+# standard library.
+
+
+def _import_gevent():
+    try:
+        import gevent
+    except ImportError:
+        raise RuntimeError(
+            "ODOO_CONCURRENCY = 'gevent' requires gevent, install it with "
+            "`pip install Flask-Odoo[gevent]`."
+        )
+    return gevent
+
+
+def create_connection(address, timeout=None, source_address=None):
+    """Cooperative replacement for `socket.create_connection`."""
+    _import_gevent()
+    from gevent import socket
+
+    return socket.create_connection(address, timeout, source_address)
+
+
+def create_ssl_context(verify: bool = True):
+    """Returns an SSL context wrapping sockets with gevent's `ssl` module."""
+    _import_gevent()
+    from gevent import ssl
+
+    # `gevent.ssl.create_default_context` returns a standard library context.
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if verify:
+        context.load_default_certs()
+    else:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def lifo_queue(maxsize: int = 0):
+    """Returns a LIFO queue whose blocking operations yield to other
+    greenlets.
+    """
+    _import_gevent()
+    from gevent.queue import LifoQueue
+
+    return LifoQueue(maxsize)
+
+
+def create_lock():
+    """Returns a lock that yields to other greenlets while it is held
+    elsewhere, for sections that make calls over gevent sockets.
+    """
+    _import_gevent()
+    from gevent.lock import RLock
+
+    return RLock()
+
+
+def spawn_many(functions: list, limit: int):
+    """Calls `functions` in greenlets, at most `limit` at a time, and returns
+    their results in order. The first exception raised is re-raised.
+    """
+    gevent = _import_gevent()
+    from gevent.pool import Pool
+
+    pool = Pool(limit)
+    greenlets = [pool.spawn(function) for function in functions]
+    gevent.joinall(greenlets, raise_error=True)
+    return [greenlet.value for greenlet in greenlets]
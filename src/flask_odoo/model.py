@@ -1,8 +1,80 @@
+import collections
+import copy
+import functools
+import time
+import types
+
 import schematics
+from flask import current_app
+from schematics.models import FieldDescriptor, ModelMeta
+from schematics.validate import prepare_validator
 
+from . import bulk, nameindex
+from .profiling import phase, profiled
+from .record import make_record_class
+from .snapshot import build_snapshot, open_snapshot
 from .types import Many2oneType
 
 
+def _compile_schema(cls):
+    # Does what `ModelMeta.__new__` does at class definition.
+    attrs = cls.__dict__["_declared_attrs"]
+    fields = collections.OrderedDict()
+    validators = {}
+    options_members = {}
+    for base in reversed(cls.__bases__):
+        if hasattr(base, "_schema"):
+            fields.update(copy.deepcopy(base._schema.fields))
+            options_members.update(dict(base._schema.options))
+            validators.update(base._schema.validators)
+    for key, value in attrs.items():
+        if key.startswith("validate_") and isinstance(
+            value, (types.FunctionType, classmethod)
+        ):
+            validators[key[9:]] = prepare_validator(value, 4)
+        if isinstance(
+            value, (schematics.types.BaseType, schematics.types.Serializable)
+        ):
+            fields[key] = value
+    fields = sorted(fields.items(), key=lambda item: item[1]._position_hint)
+    for key, field in fields:
+        if isinstance(field, schematics.types.BaseType):
+            setattr(cls, key, FieldDescriptor(key))
+        else:
+            setattr(cls, key, field)
+    options = ModelMeta._read_options(
+        cls.__name__, cls.__bases__, attrs, options_members
+    )
+    return schematics.schema.Schema(
+        cls.__name__,
+        *(schematics.schema.Field(key, field) for key, field in fields),
+        model=cls,
+        options=options,
+        validators=validators,
+    )
+
+
+class _LazySchema:
+    def __get__(self, instance, owner):
+        schema = _compile_schema(owner)
+        # Replaces this descriptor on the class.
+        owner._schema = schema
+        return schema
+
+
+class LazyModelMeta(ModelMeta):
+    """Metaclass compiling the schematics schema of a model on first use,
+    when the class is instantiated or its `_schema` read, rather than when
+    it is defined.
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        klass = type.__new__(mcs, name, bases, attrs)
+        klass._declared_attrs = dict(attrs)
+        klass._schema = _LazySchema()
+        return klass
+
+
 def _model_name(cls):
     return cls._name or cls.__name__.lower()
 
@@ -16,49 +88,222 @@ def _construct_domain(cls, search_criteria: list = None):
     return domain
 
 
+@profiled
 def search_count(cls, search_criteria: list = None):
     model_name = cls._model_name()
     domain = cls._construct_domain(search_criteria)
     return cls._odoo[model_name].search_count(domain)
 
 
+@profiled
 def fields_get(cls):
     model_name = cls._model_name()
     return cls._odoo[model_name].fields_get()
 
 
+def _read_fields(cls):
+    # Computed on first use and cached on the class, not its bases.
+    fields = cls.__dict__.get("_read_fields_cache")
+    if fields is None:
+        fields = [
+            field.serialized_name or name
+            for name, field in cls._schema.fields.items()
+            if not isinstance(field, schematics.types.Serializable)
+        ]
+        cls._read_fields_cache = fields
+    return list(fields)
+
+
+def _record_class(cls):
+    record_class = cls.__dict__.get("_record_class_cache")
+    if record_class is None:
+        record_class = make_record_class(cls)
+        cls._record_class_cache = record_class
+    return record_class
+
+
+@profiled
 def search_read(
     cls,
     search_criteria: list = None,
     offset: int = None,
     limit: int = None,
     order: str = None,
+    lightweight: bool = False,
+    stream: bool = False,
 ):
     model_name = cls._model_name()
     domain = cls._construct_domain(search_criteria)
-    fields = [
-        field.serialized_name or name
-        for name, field in cls._schema.fields.items()
-        if not isinstance(field, schematics.types.Serializable)
-    ]
-    kwargs = {"fields": fields}
+    kwargs = {"fields": cls._read_fields()}
     if offset:
         kwargs["offset"] = offset
     if limit:
         kwargs["limit"] = limit
     if order:
         kwargs["order"] = order
+    hydrate = cls._record_class().from_row if lightweight else cls
+    if not (offset or order or stream):
+        rows = cls._search_snapshot(search_criteria, limit)
+        if rows is not None:
+            with phase("hydrate"):
+                return [hydrate(row) for row in rows]
+    if stream:
+        records = cls._odoo[model_name].search_read.stream(domain, **kwargs)
+        return (hydrate(rec) for rec in records)
     records = cls._odoo[model_name].search_read(domain, **kwargs)
-    return [cls(rec) for rec in records]
+    with phase("hydrate"):
+        return [hydrate(rec) for rec in records]
+
+
+def _equality_criteria(search_criteria: list):
+    criteria = {}
+    for criterion in search_criteria or []:
+        if (
+            not isinstance(criterion, (list, tuple))
+            or len(criterion) != 3
+            or criterion[1] not in ("=", "==")
+        ):
+            return None
+        criteria[criterion[0]] = criterion[2]
+    return criteria
+
+
+def _database(cls):
+    tenant = cls._odoo.tenant
+    if tenant is not None:
+        return tenant.db
+    return current_app.config["ODOO_DB"]
+
+
+def _snapshot_path(cls):
+    # Snapshots hold the data of one database. A `{db}` placeholder in the
+    # path gives each tenant its own file, otherwise the snapshot is not
+    # used while a tenant is bound.
+    if not cls._snapshot:
+        return None
+    if "{db}" in cls._snapshot:
+        return cls._snapshot.format(db=cls._database())
+    if cls._odoo.tenant is not None:
+        return None
+    return cls._snapshot
+
 
+def _open_snapshot(cls):
+    path = cls._snapshot_path()
+    if path:
+        return open_snapshot(path)
+    return None
 
+
+def _search_snapshot(cls, search_criteria: list = None, limit: int = None):
+    # Only equality criteria on snapshotted fields are served locally, the
+    # snapshot already has `_domain` applied.
+    snapshot = cls._open_snapshot()
+    if snapshot is None:
+        return None
+    criteria = _equality_criteria(search_criteria)
+    if criteria is None or not all(
+        key in snapshot.columns for key in criteria
+    ):
+        return None
+    try:
+        # Values Odoo would cast, like ids passed as strings, are converted
+        # to the column's kind, others are left to Odoo.
+        criteria = {
+            key: snapshot.columns[key].coerce(value)
+            for key, value in criteria.items()
+        }
+    except ValueError:
+        return None
+    return snapshot.find(criteria, limit=limit)
+
+
+def refresh_snapshot(cls, page_size: int = 1000):
+    """Rebuilds the snapshot file and atomically swaps it in."""
+    path = cls._snapshot_path()
+    if path is None:
+        raise RuntimeError(
+            f"{cls.__name__} has no snapshot for the bound tenant, "
+            "add a {db} placeholder to its _snapshot path."
+        )
+    return build_snapshot(cls, path, page_size=page_size)
+
+
+def _get_name_index(cls):
+    indexes = cls.__dict__.get("_name_index_cache")
+    if indexes is None:
+        indexes = cls._name_index_cache = {}
+    # Indexes are kept per database, tenants may use different ones.
+    db = cls._database()
+    index = indexes.get(db)
+    if index is None:
+        index = indexes.setdefault(
+            db, nameindex.NameIndex(lock_factory=cls._odoo.create_lock)
+        )
+    if index.updated_at is None:
+        with index.refresh_lock:
+            if index.updated_at is None:
+                nameindex.build_name_index(
+                    cls,
+                    index,
+                    page_size=current_app.config["ODOO_NAME_INDEX_PAGE_SIZE"],
+                )
+        return index
+    ttl = current_app.config["ODOO_NAME_INDEX_TTL"]
+    if ttl is not None and time.monotonic() - index.updated_at > ttl:
+        # Only one thread refreshes, the others use the index as it is.
+        if index.refresh_lock.acquire(blocking=False):
+            try:
+                nameindex.refresh_name_index(cls, index)
+            finally:
+                index.refresh_lock.release()
+    return index
+
+
+def refresh_name_index(cls):
+    """Updates the name index with the records written since its last
+    refresh, e.g. from an `on_change` callback.
+    """
+    index = cls._get_name_index()
+    with index.refresh_lock:
+        nameindex.refresh_name_index(cls, index)
+
+
+@profiled
+def name_search(
+    cls,
+    name: str = "",
+    args: list = None,
+    operator: str = "ilike",
+    limit: int = 100,
+):
+    if cls._name_index and not args and operator == "ilike":
+        return cls._get_name_index().search(name, limit=limit)
+    model_name = cls._model_name()
+    domain = cls._construct_domain(args)
+    return cls._odoo[model_name].name_search(
+        name, args=domain, operator=operator, limit=limit
+    )
+
+
+@profiled
 def search_by_id(cls, id):
+    snapshot = cls._open_snapshot()
+    if snapshot is not None:
+        try:
+            id = snapshot.id_column.coerce(id)
+        except ValueError:
+            snapshot = None
+    if snapshot is not None:
+        row = snapshot.get(id)
+        return cls(row) if row else None
     search_criteria = [["id", "=", id]]
     objects = cls.search_read(search_criteria, limit=1)
     return objects[0] if objects else None
 
 
-def create_or_update(self):
+@profiled
+def create_or_update(self, deferred: bool = False):
     model_name = self._model_name()
     vals = self.to_primitive()
     vals.pop("id", None)
@@ -71,12 +316,34 @@ def create_or_update(self):
                 vals[key] = vals[key][0]
         else:
             pass
-    if self.id:
+    if deferred:
+        callback = None if self.id else functools.partial(setattr, self, "id")
+        self._odoo.enqueue(model_name, self.id, vals, callback=callback)
+    elif self.id:
         self._odoo[model_name].write([self.id], vals)
     else:
         self.id = self._odoo[model_name].create(vals)
 
 
+@profiled
+def bulk_upsert(
+    cls,
+    instances: list,
+    key: str = bulk.EXTERNAL_ID,
+    chunk_size: int = None,
+    workers: int = None,
+):
+    config = current_app.config
+    return bulk.bulk_upsert(
+        cls,
+        instances,
+        key=key,
+        chunk_size=chunk_size or config["ODOO_BULK_CHUNK_SIZE"],
+        workers=workers or config["ODOO_BULK_WORKERS"],
+    )
+
+
+@profiled
 def delete(self):
     model_name = self._model_name()
     if self.id:
@@ -89,20 +356,33 @@ def __repr__(self):
 
 def make_model_base(odoo):
     """Return a base class for Odoo models to inherit from."""
-    return type(
+    return LazyModelMeta(
         "BaseModel",
         (schematics.models.Model,),
         dict(
             _odoo=odoo,
             _name=None,
             _domain=None,
+            _snapshot=None,
+            _name_index=False,
             id=schematics.types.IntType(),
             _model_name=classmethod(_model_name),
             _construct_domain=classmethod(_construct_domain),
+            _read_fields=classmethod(_read_fields),
+            _record_class=classmethod(_record_class),
+            _database=classmethod(_database),
+            _snapshot_path=classmethod(_snapshot_path),
+            _open_snapshot=classmethod(_open_snapshot),
+            _search_snapshot=classmethod(_search_snapshot),
+            refresh_snapshot=classmethod(refresh_snapshot),
+            _get_name_index=classmethod(_get_name_index),
+            refresh_name_index=classmethod(refresh_name_index),
+            name_search=classmethod(name_search),
             search_count=classmethod(search_count),
             search_read=classmethod(search_read),
             search_by_id=classmethod(search_by_id),
             fields_get=classmethod(fields_get),
+            bulk_upsert=classmethod(bulk_upsert),
             create_or_update=create_or_update,
             delete=delete,
             __repr__=__repr__,
@@ -0,0 +1,228 @@
+import bisect
+import collections
+import itertools
+import threading
+import time
+
+
+def _normalize(text: str):
+    return " ".join(text.casefold().split())
+
+
+def _trigrams(text: str):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _word_starts(text: str):
+    return [0] + [i + 1 for i, char in enumerate(text) if char == " "]
+
+
+# Batches with at least 1 row per `BULK_RATIO` indexed names are sorted in
+# bulk rather than inserted one by one.
+BULK_RATIO = 16
+
+
+class NameIndex:
+    """An in-memory index answering `ilike` typeahead queries on display
+    names.
+
+    Names are indexed by the suffixes starting at each word, kept sorted for
+    prefix lookups by binary search, and by trigrams for substring lookups.
+    Matches at the start of a word come first.
+
+    Args:
+        lock_factory: Callable returning `refresh_lock`, held while the index
+            is read from Odoo.
+
+    Examples:
+        >>> index = NameIndex()
+        >>> index.update([{"id": 1, "display_name": "New Zealand"}])
+        >>> index.search("zea")
+        [[1, 'New Zealand']]
+
+    """
+
+    def __init__(self, lock_factory=threading.Lock):
+        self.names = {}
+        self.write_date = None
+        self.updated_at = None
+        self._normalized = {}
+        self._suffixes = []
+        self._trigrams = collections.defaultdict(set)
+        self._ordered = None
+        self._lock = threading.Lock()
+        self.refresh_lock = lock_factory()
+
+    def _remove(self, id: int):
+        name = self._normalized.pop(id, None)
+        if name is None:
+            return
+        del self.names[id]
+        self._ordered = None
+        for start in _word_starts(name):
+            index = bisect.bisect_left(self._suffixes, (name[start:], id))
+            del self._suffixes[index]
+        for trigram in _trigrams(name):
+            self._trigrams[trigram].discard(id)
+
+    def _remove_many(self, ids: set):
+        ids = ids & self._normalized.keys()
+        if not ids:
+            return
+        for id in ids:
+            name = self._normalized.pop(id)
+            del self.names[id]
+            for trigram in _trigrams(name):
+                self._trigrams[trigram].discard(id)
+        self._ordered = None
+        self._suffixes = [
+            item for item in self._suffixes if item[1] not in ids
+        ]
+
+    def _add(self, id: int, display_name: str, sort: bool = True):
+        name = _normalize(display_name)
+        self.names[id] = display_name
+        self._ordered = None
+        self._normalized[id] = name
+        for start in _word_starts(name):
+            if sort:
+                bisect.insort(self._suffixes, (name[start:], id))
+            else:
+                self._suffixes.append((name[start:], id))
+        for trigram in _trigrams(name):
+            self._trigrams[trigram].add(id)
+
+    def update(self, rows: list):
+        """Adds or replaces the names of `rows`, dicts with `id` and
+        `display_name` keys and an optional `write_date`.
+        """
+        # The last row of a record wins.
+        rows = list({row["id"]: row for row in rows}.values())
+        with self._lock:
+            # Inserting in place is linear in the size of the index, large
+            # batches are appended and the suffixes sorted once instead.
+            bulk = len(rows) * BULK_RATIO >= len(self.names)
+            if bulk:
+                self._remove_many({row["id"] for row in rows})
+            for row in rows:
+                if not bulk:
+                    self._remove(row["id"])
+                if row.get("display_name"):
+                    self._add(row["id"], row["display_name"], sort=not bulk)
+                write_date = row.get("write_date")
+                if write_date and (
+                    self.write_date is None or write_date > self.write_date
+                ):
+                    self.write_date = write_date
+            if bulk:
+                self._suffixes.sort()
+            self.updated_at = time.monotonic()
+
+    def remove(self, ids: list):
+        with self._lock:
+            for id in ids:
+                self._remove(id)
+
+    def _ids_by_name(self):
+        if self._ordered is None:
+            self._ordered = sorted(self.names, key=self.names.get)
+        return self._ordered
+
+    def _prefix_matches(self, query: str):
+        start = bisect.bisect_left(self._suffixes, (query,))
+        for index in range(start, len(self._suffixes)):
+            suffix, id = self._suffixes[index]
+            if not suffix.startswith(query):
+                break
+            yield id
+
+    def _substring_matches(self, query: str):
+        if len(query) < 3:
+            candidates = self._ids_by_name()
+        else:
+            sets = sorted(
+                (self._trigrams.get(t, ()) for t in _trigrams(query)),
+                key=len,
+            )
+            candidates = set(sets[0]).intersection(*sets[1:])
+            candidates = sorted(candidates, key=self.names.get)
+        for id in candidates:
+            if query in self._normalized[id]:
+                yield id
+
+    def search(self, name: str = "", limit: int = 100):
+        """Returns `[id, display_name]` pairs whose display name contains
+        `name`, ignoring case.
+        """
+        query = _normalize(name)
+        with self._lock:
+            if query:
+                matches = itertools.chain(
+                    self._prefix_matches(query),
+                    self._substring_matches(query),
+                )
+            else:
+                matches = self._ids_by_name()
+            seen = set()
+            result = []
+            for id in matches:
+                if id in seen:
+                    continue
+                seen.add(id)
+                result.append([id, self.names[id]])
+                if limit and len(result) >= limit:
+                    break
+            return result
+
+    def __len__(self):
+        return len(self.names)
+
+
+INDEX_FIELDS = ["id", "display_name", "write_date"]
+
+
+def build_name_index(model, index: NameIndex, page_size: int = 1000):
+    """Fills `index` with the display names of all records of `model`,
+    read in pages.
+    """
+    model_name = model._model_name()
+    domain = model._construct_domain()
+    rows = []
+    offset = 0
+    while True:
+        page = model._odoo[model_name].search_read(
+            domain,
+            fields=INDEX_FIELDS,
+            offset=offset,
+            limit=page_size,
+            order="id",
+        )
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    # Updated once, so that the suffixes are sorted once.
+    index.update(rows)
+
+
+def refresh_name_index(model, index: NameIndex):
+    """Updates `index` with the records of `model` written since the last
+    refresh. Deleted records stay in the index until it is rebuilt.
+    """
+    model_name = model._model_name()
+    object = model._odoo[model_name]
+    domain = (
+        [["write_date", ">=", index.write_date]] if index.write_date else []
+    )
+    # Archived records are included, so that they leave the index.
+    changed = object.search_read(
+        domain, fields=["id"], context={"active_test": False}
+    )
+    ids = [row["id"] for row in changed]
+    rows = []
+    if ids:
+        rows = object.search_read(
+            model._construct_domain([["id", "in", ids]]), fields=INDEX_FIELDS
+        )
+        index.remove(set(ids) - {row["id"] for row in rows})
+    index.update(rows)
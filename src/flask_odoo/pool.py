@@ -0,0 +1,83 @@
+import contextlib
+import queue
+
+
+def close_proxy(server_proxy):
+    """Closes the HTTP connection held by an XML-RPC server proxy."""
+    server_proxy._ServerProxy__close()
+
+
+class ProxyPool:
+    """Keeps a bounded set of reusable XML-RPC server proxies for a single
+    endpoint.
+
+    A `xmlrpc.client.ServerProxy` holds one persistent HTTP connection and
+    must not be shared between threads, so callers borrow a proxy for the
+    duration of a call and hand it back afterwards.
+
+    Args:
+        factory: Callable returning a new server proxy.
+        maxsize: Maximum number of idle proxies kept for reuse.
+        queue_factory: Callable returning the queue of idle proxies given
+            `maxsize`, e.g. a greenlet-safe queue.
+
+    Examples:
+        >>> pool = ProxyPool(lambda: ServerProxy(url), maxsize=4)
+        >>> with pool.connection() as object:
+        ...     object.execute_kw(...)
+
+    """
+
+    def __init__(
+        self, factory, maxsize: int = 10, queue_factory=queue.LifoQueue
+    ):
+        self.factory = factory
+        self.maxsize = maxsize
+        self._idle = queue_factory(maxsize)
+        self._closed = False
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.factory()
+
+    def release(self, server_proxy):
+        if self._closed:
+            close_proxy(server_proxy)
+            return
+        try:
+            self._idle.put_nowait(server_proxy)
+        except queue.Full:
+            close_proxy(server_proxy)
+
+    @contextlib.contextmanager
+    def connection(self):
+        import xmlrpc.client
+
+        server_proxy = self.acquire()
+        try:
+            yield server_proxy
+        except xmlrpc.client.Fault:
+            # The server answered, the connection is still usable.
+            self.release(server_proxy)
+            raise
+        except Exception:
+            close_proxy(server_proxy)
+            raise
+        else:
+            self.release(server_proxy)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                server_proxy = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            close_proxy(server_proxy)
+
+    def __repr__(self):
+        return (
+            f"<ProxyPool(idle={self._idle.qsize()}, maxsize={self.maxsize})>"
+        )
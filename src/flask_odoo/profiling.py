@@ -0,0 +1,128 @@
+import collections
+import contextlib
+import functools
+import time
+
+from flask import _app_ctx_stack
+
+# Phases reported in the `Server-Timing` header, in order.
+PHASES = [
+    "authenticate",
+    "connect",
+    "send",
+    "server",
+    "unmarshal",
+    "hydrate",
+]
+
+
+class Profile:
+    """Times the phases of the Odoo calls made while handling a request.
+
+    Phases nest: a model method contains the RPC calls it makes, which
+    contain their connect, send, server and unmarshal phases. Totals are
+    kept per phase name, self times per stack of phase names.
+
+    Examples:
+        >>> profile = Profile()
+        >>> with profile.phase("res.partner.read"):
+        ...     with profile.phase("server"):
+        ...         pass
+        >>> profile.server_timing()
+        'odoo.server;dur=0.01'
+        >>> profile.collapsed()
+        'res.partner.read 2\\nres.partner.read;server 10'
+
+    """
+
+    def __init__(self):
+        self.totals = collections.OrderedDict()
+        self.stacks = collections.OrderedDict()
+        self._stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        frame = [name, 0.0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            self.add(name, elapsed, children=frame[1])
+
+    def add(self, name: str, seconds: float, children: float = 0.0):
+        """Records `seconds` spent in phase `name` under the current stack,
+        `children` of which were spent in nested phases.
+        """
+        path = ";".join([frame[0] for frame in self._stack] + [name])
+        self.stacks[path] = self.stacks.get(path, 0.0) + seconds - children
+        total = self.totals.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+        if self._stack:
+            self._stack[-1][1] += seconds
+
+    def server_timing(self):
+        """Returns the phase totals as a `Server-Timing` header value, with
+        durations in milliseconds.
+        """
+        return ", ".join(
+            f"odoo.{name};dur={self.totals[name][0] * 1000:.2f}"
+            for name in PHASES
+            if name in self.totals
+        )
+
+    def collapsed(self):
+        """Returns the self time of every stack in microseconds, in the
+        collapsed format read by flame graph tools.
+        """
+        return "\n".join(
+            f"{path} {round(seconds * 1000000)}"
+            for path, seconds in self.stacks.items()
+        )
+
+    def as_dict(self):
+        return {
+            name: {"seconds": seconds, "count": count}
+            for name, (seconds, count) in self.totals.items()
+        }
+
+
+def current_profile():
+    """Returns the `Profile` of the current application context, if any."""
+    ctx = _app_ctx_stack.top
+    if ctx is None:
+        return None
+    return getattr(ctx, "odoo_profile", None)
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Times a phase in the current profile, does nothing if there is
+    none.
+    """
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    with profile.phase(name):
+        yield
+
+
+def profiled(function):
+    """Decorates a model method so that its calls are timed as a phase named
+    after the model class and the method.
+    """
+
+    @functools.wraps(function)
+    def wrapper(obj, *args, **kwargs):
+        profile = current_profile()
+        if profile is None:
+            return function(obj, *args, **kwargs)
+        cls = obj if isinstance(obj, type) else type(obj)
+        with profile.phase(f"{cls.__name__}.{function.__name__}"):
+            return function(obj, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,58 @@
+import collections
+
+import schematics
+
+
+def make_record_class(model):
+    """Return a compact read-only record class for an `odoo.Model` subclass.
+
+    Records are tuples with one attribute per declared field, so they cost a
+    fraction of the memory of a schematics model instance. Values are
+    converted by the declared field types, and `to_model` turns a record into
+    a full model instance when needed.
+
+    Args:
+        model: `odoo.Model` subclass.
+
+    Examples:
+        >>> Record = make_record_class(Partner)
+        >>> record = Record.from_row({"id": 1, "name": "Odoo"})
+        >>> record.name
+        'Odoo'
+        >>> record.to_model()
+        <Partner(id=1)>
+
+    """
+    fields = [
+        (name, field.serialized_name or name, field)
+        for name, field in model._schema.fields.items()
+        if not isinstance(field, schematics.types.Serializable)
+    ]
+    base = collections.namedtuple(
+        f"{model.__name__}Record", [name for name, key, field in fields]
+    )
+
+    def from_row(cls, row: dict):
+        values = []
+        for name, key, field in fields:
+            value = row.get(key)
+            values.append(None if value is None else field.to_native(value))
+        return tuple.__new__(cls, values)
+
+    def to_model(self):
+        return model(self._asdict())
+
+    def __repr__(self):
+        return f"<{model.__name__}Record(id={self.id})>"
+
+    return type(
+        base.__name__,
+        (base,),
+        dict(
+            __slots__=(),
+            _model=model,
+            from_row=classmethod(from_row),
+            to_model=to_model,
+            __repr__=__repr__,
+        ),
+    )
@@ -0,0 +1,148 @@
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+READ_METHODS = frozenset(["search_read", "read", "search_count", "fields_get"])
+
+
+class Node:
+    """A single Odoo application node.
+
+    A node is ejected from rotation after `max_failures` consecutive
+    connection failures and becomes eligible again once `eject_seconds`
+    have passed or a health check succeeds.
+
+    Args:
+        url: Base URL of the node, e.g. `http://odoo-1:8069`.
+        role: Either `"primary"` or `"replica"`.
+        pool: `ProxyPool` of object proxies connected to this node.
+        max_failures: Consecutive failures before the node is ejected.
+        eject_seconds: How long an ejected node stays out of rotation.
+
+    """
+
+    def __init__(
+        self,
+        url: str,
+        role: str = PRIMARY,
+        pool=None,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+    ):
+        if role not in (PRIMARY, REPLICA):
+            raise ValueError(f"Unknown Odoo node role '{role}'.")
+        self.url = url
+        self.role = role
+        self.pool = pool
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.ejected_until
+
+    @contextlib.contextmanager
+    def track(self):
+        """Counts the node as busy for the duration of the block."""
+        with self._lock:
+            self.outstanding += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.outstanding -= 1
+
+    def mark_success(self):
+        with self._lock:
+            self.failures = 0
+            self.ejected_until = 0.0
+
+    def mark_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.ejected_until = time.monotonic() + self.eject_seconds
+                logger.warning(
+                    "Ejecting Odoo node %s after %d failures",
+                    self.url,
+                    self.failures,
+                )
+
+    def __repr__(self):
+        return (
+            f"<Node(url='{self.url}', role='{self.role}', "
+            f"outstanding={self.outstanding})>"
+        )
+
+
+class NodeSet:
+    """Routes Odoo calls to nodes by method and current load.
+
+    Read methods go to the least busy available replica, falling back to
+    primaries when no replica is available. Every other method goes to the
+    least busy available primary.
+
+    Args:
+        nodes: List of `Node` instances.
+
+    """
+
+    def __init__(self, nodes: list):
+        self.nodes = list(nodes)
+        self.primaries = [n for n in self.nodes if n.role == PRIMARY]
+        self.replicas = [n for n in self.nodes if n.role == REPLICA]
+        if not self.primaries:
+            raise ValueError("At least one primary Odoo node is required.")
+
+    def pick(self, method_name: str):
+        """Returns the node to send `method_name` to. Read methods go to a
+        replica, or a primary when none is available. Any other method may
+        write, so it goes to a primary.
+        """
+        if method_name in READ_METHODS:
+            groups = [self.replicas, self.primaries]
+        else:
+            groups = [self.primaries]
+        for group in groups:
+            available = [n for n in group if n.available]
+            if available:
+                return min(available, key=lambda n: n.outstanding)
+        # Every candidate is ejected, trying one beats failing outright.
+        return min(groups[-1], key=lambda n: n.outstanding)
+
+    def check_health(self, version):
+        """Probes every node with `version(node)` and updates its state.
+
+        Args:
+            version: Callable calling `common.version` on the given node.
+
+        """
+        for node in self.nodes:
+            try:
+                version(node)
+            except Exception:
+                logger.exception("Odoo node %s failed health check", node.url)
+                node.mark_failure()
+            else:
+                node.mark_success()
+
+    def close(self):
+        for node in self.nodes:
+            if node.pool is not None:
+                node.pool.close()
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __repr__(self):
+        return f"<NodeSet(nodes={self.nodes})>"
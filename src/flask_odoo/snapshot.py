@@ -0,0 +1,363 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+import schematics
+
+from .types import Many2oneType
+
+MAGIC = b"FOSNAP1\n"
+HEADER_LENGTH = struct.Struct("<I")
+INT = struct.Struct("<q")
+FLOAT = struct.Struct("<d")
+LENGTH = struct.Struct("<I")
+NULL = b"\x00"
+PRESENT = b"\x01"
+
+
+def _column_kind(field):
+    if isinstance(field, schematics.types.BooleanType):
+        return "bool"
+    if isinstance(field, schematics.types.IntType):
+        return "int"
+    if isinstance(field, schematics.types.FloatType):
+        return "float"
+    if isinstance(field, schematics.types.StringType):
+        return "str"
+    if isinstance(field, Many2oneType):
+        return "many2one"
+    return "json"
+
+
+class Column:
+    """A fixed-width column of a snapshot.
+
+    Each cell is a presence byte followed by the value: 1 byte for booleans,
+    8 bytes for integers and floats, and a 4 byte length plus padded UTF-8
+    data for strings. Many2one cells hold the id followed by a string with
+    the display name, any other value is stored as a JSON string.
+
+    Args:
+        name: Field name on the model.
+        key: Odoo field name the values are read from.
+        kind: One of `bool`, `int`, `float`, `str`, `many2one` or `json`.
+        width: Cell width in bytes, presence byte included.
+        offset: Byte offset of the column in the file.
+
+    """
+
+    def __init__(
+        self, name: str, key: str, kind: str, width: int = 1, offset: int = 0
+    ):
+        self.name = name
+        self.key = key
+        self.kind = kind
+        self.width = width
+        self.offset = offset
+
+    def _data(self, value):
+        if self.kind == "str":
+            return value.encode("utf-8")
+        if self.kind == "many2one":
+            return value[1].encode("utf-8")
+        return json.dumps(value, sort_keys=True).encode("utf-8")
+
+    def fit(self, value):
+        """Widens the column so that `value` fits in a cell."""
+        if value is None:
+            return
+        if self.kind == "bool":
+            width = 2
+        elif self.kind in ("int", "float"):
+            width = 1 + INT.size
+        else:
+            width = 1 + LENGTH.size + len(self._data(value))
+            if self.kind == "many2one":
+                width += INT.size
+        self.width = max(self.width, width)
+
+    def coerce(self, value):
+        """Converts a search value to the kind of the column, e.g. the
+        string `"21"` to an integer.
+
+        Raises:
+            ValueError: The value does not fit the column.
+
+        """
+        if value is None or value is False or self.kind == "json":
+            return value
+        if self.kind == "many2one" and isinstance(value, (list, tuple)):
+            if len(value) == 2 and isinstance(value[1], str):
+                return [_coerce_int(value[0]), value[1]]
+        elif self.kind in ("int", "many2one"):
+            return _coerce_int(value)
+        elif self.kind == "float":
+            return _coerce_float(value)
+        elif isinstance(value, {"bool": bool, "str": str}[self.kind]):
+            return value
+        raise ValueError(f"{value!r} does not fit a {self.kind} column.")
+
+    def encode(self, value):
+        if value is None:
+            return NULL * self.width
+        if self.kind == "bool":
+            cell = b"\x01" if value else b"\x00"
+        elif self.kind == "int":
+            cell = INT.pack(value)
+        elif self.kind == "float":
+            cell = FLOAT.pack(value)
+        else:
+            data = self._data(value)
+            cell = LENGTH.pack(len(data)) + data
+            if self.kind == "many2one":
+                cell = INT.pack(value[0]) + cell
+        return (PRESENT + cell).ljust(self.width, b"\0")
+
+    def decode(self, cell):
+        if cell[0] == 0:
+            return None
+        if self.kind == "bool":
+            return cell[1] == 1
+        if self.kind == "int":
+            return INT.unpack_from(cell, 1)[0]
+        if self.kind == "float":
+            return FLOAT.unpack_from(cell, 1)[0]
+        start = 1 + (INT.size if self.kind == "many2one" else 0)
+        (length,) = LENGTH.unpack_from(cell, start)
+        start += LENGTH.size
+        data = bytes(cell[start : start + length]).decode("utf-8")
+        if self.kind == "str":
+            return data
+        if self.kind == "many2one":
+            return [INT.unpack_from(cell, 1)[0], data]
+        return json.loads(data)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "key": self.key,
+            "kind": self.kind,
+            "width": self.width,
+            "offset": self.offset,
+        }
+
+
+def _coerce_int(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        return int(value)
+    raise ValueError(f"{value!r} is not an integer.")
+
+
+def _coerce_float(value):
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f"{value!r} is not a number.")
+
+
+def _normalize(column, value):
+    # Odoo returns False for empty values of any type.
+    if value is False and column.kind != "bool":
+        return None
+    return value
+
+
+def write_snapshot(path: str, model_name: str, columns: list, rows: list):
+    """Writes `rows` to a snapshot file at `path`, atomically replacing it.
+
+    Rows are sorted by id, so the id column doubles as the index.
+    """
+    rows = sorted(rows, key=lambda row: row["id"])
+    values = [
+        [_normalize(column, row.get(column.key)) for row in rows]
+        for column in columns
+    ]
+    for column, column_values in zip(columns, values):
+        for value in column_values:
+            column.fit(value)
+    header = {"model": model_name, "count": len(rows), "columns": []}
+    offset = 0
+    for column in columns:
+        column.offset = offset
+        offset += column.width * len(rows)
+        header["columns"].append(column.to_dict())
+    header_data = json.dumps(header).encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(MAGIC)
+            file.write(HEADER_LENGTH.pack(len(header_data)))
+            file.write(header_data)
+            for column, column_values in zip(columns, values):
+                for value in column_values:
+                    file.write(column.encode(value))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Snapshot:
+    """A read-only, memory-mapped table of Odoo records.
+
+    Columns are stored one after another with fixed-width cells, so a cell
+    is found by offset arithmetic and every process mapping the file shares
+    the same pages. Rows are sorted by id for binary search.
+
+    Args:
+        path: Path of the snapshot file.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.stat = os.fstat(file.fileno())
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a snapshot file.")
+        (length,) = HEADER_LENGTH.unpack_from(self.mmap, len(MAGIC))
+        start = len(MAGIC) + HEADER_LENGTH.size
+        header = json.loads(self.mmap[start : start + length])
+        self.data_offset = start + length
+        self.model_name = header["model"]
+        self.count = header["count"]
+        self.columns = {c["key"]: Column(**c) for c in header["columns"]}
+        self.id_column = self.columns["id"]
+        self.view = memoryview(self.mmap)
+
+    def _cell(self, column, index):
+        start = self.data_offset + column.offset + column.width * index
+        return self.view[start : start + column.width]
+
+    def _id(self, index):
+        return self.id_column.decode(self._cell(self.id_column, index))
+
+    def row(self, index: int):
+        """Returns the row at `index` as a dict keyed by Odoo field names."""
+        return {
+            column.key: column.decode(self._cell(column, index))
+            for column in self.columns.values()
+        }
+
+    def get(self, id: int):
+        """Returns the row with the given id or `None`."""
+        index = bisect.bisect_left(_IdSequence(self), id)
+        if index < self.count and self._id(index) == id:
+            return self.row(index)
+        return None
+
+    def find(self, criteria: dict, limit: int = None):
+        """Returns the rows whose fields equal the given values.
+
+        Args:
+            criteria: Dict mapping Odoo field names to values. Many2one
+                fields may be matched by id alone.
+            limit: Maximum number of rows to return.
+
+        """
+        columns = []
+        for key, value in criteria.items():
+            column = self.columns[key]
+            if column.kind == "many2one" and isinstance(value, int):
+                cell = PRESENT + INT.pack(value)
+            else:
+                cell = column.encode(_normalize(column, value))
+            columns.append((column, cell))
+        rows = []
+        for index in range(self.count):
+            if all(
+                self._cell(column, index)[: len(cell)] == cell
+                for column, cell in columns
+            ):
+                rows.append(self.row(index))
+                if limit and len(rows) >= limit:
+                    break
+        return rows
+
+    def is_stale(self):
+        """Whether the file has been replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) != (
+            self.stat.st_ino,
+            self.stat.st_mtime_ns,
+        )
+
+    def close(self):
+        self.view.release()
+        self.mmap.close()
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"<Snapshot(model='{self.model_name}', count={self.count})>"
+
+
+class _IdSequence:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return self.snapshot.count
+
+    def __getitem__(self, index):
+        return self.snapshot._id(index)
+
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def open_snapshot(path: str):
+    """Returns the mapped snapshot at `path`, remapping it once the file has
+    been replaced by a refresh. Returns `None` if the file does not exist.
+    """
+    with _lock:
+        snapshot = _snapshots.get(path)
+        if snapshot is not None and not snapshot.is_stale():
+            return snapshot
+        try:
+            _snapshots[path] = Snapshot(path)
+        except FileNotFoundError:
+            return None
+        # The previous map is left to the garbage collector, rows being
+        # read from it in other threads stay valid.
+        return _snapshots[path]
+
+
+def build_snapshot(model, path: str, page_size: int = 1000):
+    """Reads all records of `model` in pages and writes them to a snapshot
+    file at `path`, atomically replacing the previous one.
+    """
+    columns = [
+        Column(name, field.serialized_name or name, _column_kind(field))
+        for name, field in model._schema.fields.items()
+        if not isinstance(field, schematics.types.Serializable)
+    ]
+    model_name = model._model_name()
+    domain = model._construct_domain()
+    fields = [column.key for column in columns]
+    rows = []
+    offset = 0
+    while True:
+        page = model._odoo[model_name].search_read(
+            domain, fields=fields, offset=offset, limit=page_size, order="id"
+        )
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    write_snapshot(path, model_name, columns, rows)
+    return len(rows)
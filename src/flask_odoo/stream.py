@@ -0,0 +1,163 @@
+import collections
+import gzip
+import http.client
+import urllib.parse
+import xmlrpc.client
+from xml.parsers import expat
+
+from . import __version__
+from .transport import GzipDecoder
+
+USER_AGENT = f"Flask-Odoo/{__version__}"
+
+
+class StreamingUnmarshaller(xmlrpc.client.Unmarshaller):
+    """Unmarshaller that hands out the structs of a returned array as soon as
+    each of them is complete, instead of building the whole list first.
+
+    Completed structs are appended to `records`. Any other result, including
+    faults, is left to `close` as in the standard unmarshaller.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = collections.deque()
+        self._outer = None
+
+    def start(self, tag, attrs):
+        if tag in ("array", "struct") and not self._marks:
+            # The tag of the outermost container, only the items of an
+            # array are handed out.
+            self._outer = tag
+        super().start(tag, attrs)
+
+    def end_struct(self, data):
+        xmlrpc.client.Unmarshaller.end_struct(self, data)
+        if len(self._marks) == 1 and self._outer == "array":
+            # The struct is an item of the top-level array.
+            self.records.append(self._stack.pop())
+
+    dispatch = dict(xmlrpc.client.Unmarshaller.dispatch)
+    dispatch["struct"] = end_struct
+
+
+def make_streaming_parser():
+    """Returns an expat push parser feeding a `StreamingUnmarshaller`."""
+    unmarshaller = StreamingUnmarshaller()
+    parser = expat.ParserCreate(None, None)
+    parser.StartElementHandler = unmarshaller.start
+    parser.EndElementHandler = unmarshaller.end
+    parser.CharacterDataHandler = unmarshaller.data
+    parser.buffer_text = True
+    unmarshaller.xml(None, None)
+    return parser, unmarshaller
+
+
+def create_connection(
+    url: str, context=None, timeout: float = None, cooperative: bool = False
+):
+    """Returns an HTTP connection to `url`, opened with gevent sockets when
+    `cooperative` is true.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme == "https":
+        connection = http.client.HTTPSConnection(
+            parts.netloc, timeout=timeout, context=context
+        )
+    else:
+        connection = http.client.HTTPConnection(parts.netloc, timeout=timeout)
+    if cooperative:
+        from .cooperative import create_connection
+
+        connection._create_connection = create_connection
+    return connection
+
+
+def post(connection, url: str, body, headers: dict = None):
+    """Sends an XML-RPC request and returns the HTTP response.
+
+    Raises:
+        xmlrpc.client.ProtocolError: The server returned an HTTP error.
+
+    """
+    headers = dict(
+        {"Content-Type": "text/xml", "User-Agent": USER_AGENT}, **headers or {}
+    )
+    connection.request("POST", urllib.parse.urlsplit(url).path, body, headers)
+    response = connection.getresponse()
+    if response.status != 200:
+        raise xmlrpc.client.ProtocolError(
+            url, response.status, response.reason, response.headers
+        )
+    return response
+
+
+def iter_response(response, chunk_size: int):
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def stream_call(
+    url: str,
+    method: str,
+    params: tuple,
+    context=None,
+    chunk_size: int = 64 * 1024,
+    timeout: float = None,
+    accept_gzip: bool = True,
+    gzip_threshold: int = None,
+    cooperative: bool = False,
+):
+    """Calls an XML-RPC method and yields the items of the returned array
+    while the response body is still being received.
+
+    Args:
+        url: Endpoint URL, e.g. `http://localhost:8069/xmlrpc/2/object`.
+        method: XML-RPC method name.
+        params: Tuple of method parameters.
+        context: Optional `ssl.SSLContext` for HTTPS endpoints.
+        chunk_size: Number of bytes read from the socket at a time.
+        timeout: Socket timeout in seconds.
+        accept_gzip: Whether to ask the server for a gzip compressed
+            response, which is then decompressed as it is received.
+        gzip_threshold: Size in bytes above which the request body is
+            compressed, `None` to never compress it.
+        cooperative: Whether to connect with gevent sockets.
+
+    Raises:
+        xmlrpc.client.Fault: The server returned a fault.
+        xmlrpc.client.ProtocolError: The server returned an HTTP error.
+
+    """
+    body = xmlrpc.client.dumps(params, method).encode("utf-8")
+    headers = {}
+    if accept_gzip:
+        headers["Accept-Encoding"] = "gzip"
+    if gzip_threshold is not None and gzip_threshold < len(body):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip.compress(body)
+    connection = create_connection(url, context, timeout, cooperative)
+    try:
+        response = post(connection, url, body, headers)
+        decoder = GzipDecoder(response.getheader("Content-Encoding", ""))
+        parser, unmarshaller = make_streaming_parser()
+        records = unmarshaller.records
+        for chunk in iter_response(response, chunk_size):
+            parser.Parse(decoder.decode(chunk), False)
+            while records:
+                yield records.popleft()
+        parser.Parse(decoder.flush(), True)
+        (result,) = unmarshaller.close()
+        while records:
+            yield records.popleft()
+        # Arrays of anything but structs are not streamed.
+        if isinstance(result, list):
+            yield from result
+        else:
+            yield result
+    finally:
+        connection.close()
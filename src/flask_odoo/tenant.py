@@ -0,0 +1,212 @@
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+from flask import _app_ctx_stack
+
+from .pool import close_proxy
+from .profiling import phase
+
+
+class Metrics:
+    """Counts calls, errors and time spent in Odoo calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.calls += 1
+                self.errors += error
+                self.seconds += elapsed
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "seconds": self.seconds,
+            }
+
+    def __repr__(self):
+        return (
+            f"<Metrics(calls={self.calls}, errors={self.errors}, "
+            f"seconds={self.seconds:.3f})>"
+        )
+
+
+class Tenant:
+    """Credentials and connection state of one Odoo database and user.
+
+    Tenants are created through `Odoo.for_tenant` and outlive the
+    application context: the uid is authenticated once and the proxy pools
+    are reused across requests. Using a tenant as a context manager binds it
+    to the current application context, so that `ObjectProxy` calls and
+    `odoo.Model` subclasses talk to its database.
+
+    Args:
+        odoo: Instance of the `Odoo` class.
+        db: Odoo database name.
+        username: Odoo login.
+        password: Odoo password or API key.
+        pool_size: Maximum number of idle proxies kept per node.
+        lock_factory: Callable returning the lock held while authenticating,
+            e.g. `Odoo.create_lock`.
+
+    Examples:
+        >>> with odoo.for_tenant("acme", "admin", "secret"):
+        ...     Partner.search_count()
+        3
+
+    """
+
+    def __init__(
+        self,
+        odoo,
+        db: str,
+        username: str,
+        password: str,
+        pool_size: int = 10,
+        lock_factory=threading.Lock,
+    ):
+        self.odoo = odoo
+        self.db = db
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size
+        self.metrics = Metrics()
+        self._uid = None
+        self._pools = {}
+        self._lock = lock_factory()
+
+    def authenticate(self):
+        """Returns a user identifier (uid) used in authenticated calls."""
+        common = self.odoo.create_common_proxy()
+        try:
+            with phase("authenticate"):
+                return common.authenticate(
+                    self.db, self.username, self.password, {}
+                )
+        finally:
+            close_proxy(common)
+
+    @property
+    def uid(self):
+        """The authenticated user identifier, cached for the lifetime of the
+        tenant.
+
+        Raises:
+            RuntimeError: Odoo rejected the credentials, the next access
+                authenticates again.
+
+        """
+        if self._uid is None:
+            with self._lock:
+                if self._uid is None:
+                    uid = self.authenticate()
+                    if not uid:
+                        raise RuntimeError(
+                            f"Odoo rejected the credentials of user "
+                            f"'{self.username}' on database '{self.db}'."
+                        )
+                    self._uid = uid
+        return self._uid
+
+    def pool(self, url: str):
+        """Returns this tenant's `ProxyPool` for the node at `url`."""
+        with self._lock:
+            if url not in self._pools:
+                self._pools[url] = self.odoo.create_pool(
+                    functools.partial(self.odoo.create_object_proxy, url),
+                    maxsize=self.pool_size,
+                )
+            return self._pools[url]
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        ctx = _app_ctx_stack.top
+        if not hasattr(ctx, "odoo_tenants"):
+            ctx.odoo_tenants = []
+        ctx.odoo_tenants.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _app_ctx_stack.top.odoo_tenants.pop()
+
+    def __repr__(self):
+        return f"<Tenant(db='{self.db}', username='{self.username}')>"
+
+
+class TenantRegistry:
+    """Caches `Tenant` instances, closing the least recently used ones once
+    more than `maxsize` are held.
+
+    Args:
+        factory: Callable creating a `Tenant` from db, username and password.
+        maxsize: Maximum number of cached tenants.
+
+    """
+
+    def __init__(self, factory, maxsize: int = 100):
+        self.factory = factory
+        self.maxsize = maxsize
+        self._tenants = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: str, username: str, password: str):
+        key = (db, username)
+        evicted = []
+        with self._lock:
+            tenant = self._tenants.get(key)
+            if tenant is not None and tenant.password != password:
+                evicted.append(self._tenants.pop(key))
+                tenant = None
+            if tenant is None:
+                tenant = self.factory(db, username, password)
+                self._tenants[key] = tenant
+            self._tenants.move_to_end(key)
+            while len(self._tenants) > self.maxsize:
+                evicted.append(self._tenants.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return tenant
+
+    def find(self, db: str, username: str):
+        """Returns the cached tenant or `None` without creating one."""
+        with self._lock:
+            return self._tenants.get((db, username))
+
+    def close(self):
+        with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            tenant.close()
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._tenants.values()))
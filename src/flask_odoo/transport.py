@@ -0,0 +1,143 @@
+import gzip
+import time
+import xmlrpc.client
+import zlib
+
+from .profiling import current_profile, phase
+
+READ_SIZE = 64 * 1024
+
+
+class GzipDecoder:
+    """Incrementally decodes a response body according to its
+    `Content-Encoding` header.
+    """
+
+    def __init__(self, content_encoding: str):
+        self.decompressor = None
+        if content_encoding == "gzip":
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decode(self, data: bytes):
+        if self.decompressor is None:
+            return data
+        return self.decompressor.decompress(data)
+
+    def flush(self):
+        if self.decompressor is None:
+            return b""
+        return self.decompressor.flush()
+
+
+class TransportMixin:
+    """Adds gzip compression and traffic counters to XML-RPC transports.
+
+    Responses are requested with `Accept-Encoding: gzip` and decompressed
+    while they are parsed, instead of being buffered in full like the
+    standard library does. Request bodies larger than `gzip_threshold` bytes
+    are compressed. When a profile is active, the connect, send, server and
+    unmarshal phases of each request are timed.
+
+    Args:
+        accept_gzip: Whether to ask the server for gzip compressed responses.
+        gzip_threshold: Size in bytes above which request bodies are
+            compressed, `None` to never compress them.
+        cooperative: Whether to connect with gevent sockets.
+
+    """
+
+    def __init__(
+        self,
+        *args,
+        accept_gzip: bool = True,
+        gzip_threshold=None,
+        cooperative: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.accept_gzip_encoding = accept_gzip
+        self.encode_threshold = gzip_threshold
+        self.cooperative = cooperative
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._sent_at = None
+
+    def make_connection(self, host):
+        with phase("connect"):
+            connection = super().make_connection(host)
+            if self.cooperative:
+                from .cooperative import create_connection
+
+                connection._create_connection = create_connection
+            # Connect now rather than when the headers are sent, so that
+            # connection setup is timed apart from sending the request.
+            if current_profile() is not None and connection.sock is None:
+                connection.connect()
+        return connection
+
+    def send_content(self, connection, request_body):
+        with phase("send"):
+            threshold = self.encode_threshold
+            if threshold is not None and threshold < len(request_body):
+                connection.putheader("Content-Encoding", "gzip")
+                request_body = gzip.compress(request_body)
+            self.bytes_sent += len(request_body)
+            connection.putheader("Content-Length", str(len(request_body)))
+            connection.endheaders(request_body)
+        self._sent_at = time.perf_counter()
+
+    def parse_response(self, response):
+        profile = current_profile()
+        if profile is not None and self._sent_at is not None:
+            # The time between sending the request and parsing the
+            # response is spent waiting for the server.
+            profile.add("server", time.perf_counter() - self._sent_at)
+        self._sent_at = None
+        with phase("unmarshal"):
+            return self._parse_response(response)
+
+    def _parse_response(self, response):
+        decoder = GzipDecoder(response.getheader("Content-Encoding", ""))
+        parser, unmarshaller = self.getparser()
+        while True:
+            data = response.read(READ_SIZE)
+            if not data:
+                break
+            self.bytes_received += len(data)
+            data = decoder.decode(data)
+            if self.verbose:
+                print("body:", repr(data))
+            parser.feed(data)
+        parser.feed(decoder.flush())
+        parser.close()
+        return unmarshaller.close()
+
+
+class Transport(TransportMixin, xmlrpc.client.Transport):
+    """Handles an HTTP transaction to an Odoo XML-RPC server."""
+
+
+class SafeTransport(TransportMixin, xmlrpc.client.SafeTransport):
+    """Handles an HTTPS transaction to an Odoo XML-RPC server."""
+
+
+def create_transport(
+    url: str,
+    context=None,
+    accept_gzip: bool = True,
+    gzip_threshold=None,
+    cooperative: bool = False,
+):
+    """Returns a `Transport` or `SafeTransport` suitable for `url`."""
+    if url.startswith("https"):
+        return SafeTransport(
+            context=context,
+            accept_gzip=accept_gzip,
+            gzip_threshold=gzip_threshold,
+            cooperative=cooperative,
+        )
+    return Transport(
+        accept_gzip=accept_gzip,
+        gzip_threshold=gzip_threshold,
+        cooperative=cooperative,
+    )
@@ -1,3 +1,6 @@
+import base64
+import binascii
+
 import schematics.types
 
 from schematics.exceptions import ConversionError
@@ -18,6 +21,7 @@ __all__ = [
     "DictType",
     "One2manyType",
     "Many2oneType",
+    "BinaryType",
 ]
 
 
@@ -114,3 +118,32 @@ class Many2oneType(schematics.types.BaseType):
 
     def to_primitive(self, value, context=None):
         return value
+
+
+class BinaryType(schematics.types.BaseType):
+    """A field that stores an Odoo Binary value.
+
+    Odoo transfers binary data base64 encoded, the native value is `bytes`.
+    """
+
+    primitive_type = str
+    native_type = bytes
+
+    MESSAGES = {
+        "convert": _("Couldn't interpret '{0}' as base64 encoded data."),
+    }
+
+    def to_native(self, value, context=None):
+        if value is False:
+            return None
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            try:
+                return base64.b64decode("".join(value.split()), validate=True)
+            except binascii.Error:
+                raise ConversionError(self.messages["convert"].format(value))
+        raise ConversionError(self.messages["convert"].format(value))
+
+    def to_primitive(self, value, context=None):
+        return base64.b64encode(value).decode("ascii")
@@ -0,0 +1,376 @@
+import http.client
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import xmlrpc.client
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    OSError,
+    http.client.HTTPException,
+    xmlrpc.client.ProtocolError,
+)
+
+
+class JsonlSpool:
+    """Persists queued writes as JSON lines so they survive a crash.
+
+    Any object providing `append`, `replay` and `rewrite` can be used
+    instead, e.g. one backed by Redis or SQLite.
+
+    Args:
+        path: Path of the spool file.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict):
+        line = json.dumps(entry, sort_keys=True) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def replay(self):
+        """Returns the entries left over from a previous run."""
+        with self._lock:
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    lines = file.readlines()
+            except FileNotFoundError:
+                return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A torn last line from a crash mid-write.
+                logger.warning("Skipping corrupt spool line in %s", self.path)
+        return entries
+
+    def rewrite(self, entries: list):
+        """Atomically replaces the spool content with `entries`."""
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                for entry in entries:
+                    file.write(json.dumps(entry, sort_keys=True) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class _Entry:
+    def __init__(self, model_name, id, vals, tenant=None, callback=None):
+        self.model_name = model_name
+        self.id = id
+        self.vals = dict(vals)
+        self.tenant = tenant
+        self.callbacks = [callback] if callback else []
+
+    def to_dict(self):
+        tenant = None
+        if self.tenant is not None:
+            tenant = [self.tenant.db, self.tenant.username]
+        return {
+            "model": self.model_name,
+            "id": self.id,
+            "vals": self.vals,
+            "tenant": tenant,
+        }
+
+
+class WriteBehindQueue:
+    """Applies `create` and `write` calls in background worker threads.
+
+    Writes to the same record that are still queued are coalesced into one.
+    Workers take up to `batch_size` entries at a time and send a single
+    `write` per model and set of values and a single `create` per model.
+    Connection errors put the calls that failed back in the queue, other
+    errors are logged and the failed calls are dropped. The spool is
+    rewritten after every batch so that it only holds writes that have not
+    been applied yet.
+
+    Spooled writes of a tenant that is not cached when the spool is
+    recovered are kept aside until `resume_parked` is called once the tenant
+    has been loaded, which `Odoo.for_tenant` does.
+
+    Args:
+        odoo: Instance of the `Odoo` class.
+        app: Flask application used to push an app context in workers.
+        maxsize: Maximum number of queued entries, `enqueue` blocks when the
+            queue is full.
+        workers: Number of worker threads.
+        batch_size: Maximum number of entries applied together.
+        spool: Optional durable spool, e.g. a `JsonlSpool`.
+        retry_delay: Seconds to wait before retrying after a connection
+            error.
+
+    """
+
+    def __init__(
+        self,
+        odoo,
+        app,
+        maxsize: int = 1000,
+        workers: int = 1,
+        batch_size: int = 100,
+        spool=None,
+        retry_delay: float = 1.0,
+    ):
+        self.odoo = odoo
+        self.app = app
+        self.maxsize = maxsize
+        self.workers = workers
+        self.batch_size = batch_size
+        self.spool = spool
+        self.retry_delay = retry_delay
+        self._pending = {}
+        self._in_flight = {}
+        self._parked = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    def _key(self, entry):
+        tenant_key = None
+        if entry.tenant is not None:
+            tenant_key = (entry.tenant.db, entry.tenant.username)
+        if entry.id:
+            return (tenant_key, entry.model_name, entry.id)
+        # Creates are never coalesced.
+        return (tenant_key, entry.model_name, None, next(self._counter))
+
+    def enqueue(
+        self,
+        model_name: str,
+        id: int,
+        vals: dict,
+        tenant=None,
+        callback=None,
+    ):
+        """Queues a `write` of `vals` to record `id`, or a `create` when
+        `id` is falsy. `callback` is called with the new id after a queued
+        create has been applied.
+        """
+        entry = _Entry(model_name, id, vals, tenant, callback)
+        self._put(entry, persist=True)
+
+    def _put(self, entry, persist):
+        key = self._key(entry)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The write-behind queue is shut down.")
+            self._start()
+            while True:
+                queued = self._pending.get(key)
+                if queued is not None:
+                    queued.vals.update(entry.vals)
+                    queued.callbacks.extend(entry.callbacks)
+                    break
+                if len(self._pending) < self.maxsize:
+                    self._pending[key] = entry
+                    break
+                self._cond.wait()
+            if persist and self.spool is not None:
+                self.spool.append(entry.to_dict())
+            self._cond.notify_all()
+
+    def _start(self):
+        if self._threads:
+            return
+        if self.spool is not None:
+            self._recover()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"flask-odoo-write-behind-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _restore(self, data):
+        # Returns `False` when the tenant of the entry is not known yet.
+        tenant = None
+        if data.get("tenant"):
+            tenant = self.odoo.tenants.find(*data["tenant"])
+            if tenant is None:
+                return False
+        entry = _Entry(data["model"], data["id"], data["vals"], tenant)
+        key = self._key(entry)
+        if key in self._pending:
+            self._pending[key].vals.update(entry.vals)
+        else:
+            self._pending[key] = entry
+        return True
+
+    def _recover(self):
+        entries = self.spool.replay()
+        with self.app.app_context():
+            for data in entries:
+                if not self._restore(data):
+                    self._parked.append(data)
+        if entries:
+            logger.info("Recovered %d spooled Odoo writes", len(entries))
+        if self._parked:
+            logger.warning(
+                "Keeping %d spooled Odoo writes of unknown tenants until "
+                "they are loaded with `for_tenant`",
+                len(self._parked),
+            )
+
+    def resume_parked(self):
+        """Queues the spooled writes of tenants that were not known when
+        the spool was recovered and have been loaded since.
+        """
+        if not self._parked:
+            return
+        with self._cond, self.app.app_context():
+            parked = self._parked
+            self._parked = [data for data in parked if not self._restore(data)]
+            if len(self._parked) < len(parked):
+                logger.info(
+                    "Recovered %d spooled Odoo writes",
+                    len(parked) - len(self._parked),
+                )
+                self._cond.notify_all()
+
+    def _take(self):
+        batch = []
+        for key in list(self._pending):
+            if key in self._in_flight:
+                continue
+            entry = self._pending.pop(key)
+            batch.append((key, entry))
+            self._in_flight[key] = entry
+            if len(batch) >= self.batch_size:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ready() and not self._closed:
+                    self._cond.wait()
+                if not self._ready():
+                    return
+                batch = self._take()
+                self._cond.notify_all()
+            try:
+                failed = self._apply([entry for key, entry in batch])
+            except Exception:
+                logger.exception("Dropping %d queued Odoo writes", len(batch))
+                failed = []
+            self._finish(batch, failed)
+            if failed:
+                if self._closed:
+                    return
+                time.sleep(self.retry_delay)
+
+    def _finish(self, batch, failed):
+        failed = {id(entry) for entry in failed}
+        with self._cond:
+            for key, entry in batch:
+                del self._in_flight[key]
+                if id(entry) in failed:
+                    queued = self._pending.pop(key, None)
+                    if queued is not None:
+                        entry.vals.update(queued.vals)
+                        entry.callbacks.extend(queued.callbacks)
+                    self._pending[key] = entry
+            if self.spool is not None:
+                self._rewrite_spool()
+            self._cond.notify_all()
+
+    def _rewrite_spool(self):
+        # Called with `_cond` held, so that no entry is appended meanwhile.
+        entries = itertools.chain(
+            self._pending.values(), self._in_flight.values()
+        )
+        self.spool.rewrite(
+            self._parked + [entry.to_dict() for entry in entries]
+        )
+
+    def _ready(self):
+        return any(key not in self._in_flight for key in self._pending)
+
+    def _idle(self):
+        return not self._pending and not self._in_flight
+
+    def _apply(self, entries):
+        """Applies `entries` grouped into as few calls as possible and
+        returns the entries of the calls that failed with a connection
+        error.
+        """
+        groups = {}
+        for entry in entries:
+            if entry.id:
+                vals_key = json.dumps(entry.vals, sort_keys=True, default=str)
+                group_key = (entry.tenant, entry.model_name, "write", vals_key)
+            else:
+                group_key = (entry.tenant, entry.model_name, "create")
+            groups.setdefault(group_key, []).append(entry)
+        failed = []
+        with self.app.app_context():
+            for (tenant, model_name, method, *rest), group in groups.items():
+                try:
+                    if tenant is not None:
+                        with tenant:
+                            self._apply_group(model_name, method, group)
+                    else:
+                        self._apply_group(model_name, method, group)
+                except RETRYABLE_ERRORS:
+                    logger.warning("Odoo unreachable, retrying queued writes")
+                    failed.extend(group)
+                except Exception:
+                    logger.exception(
+                        "Dropping %d queued Odoo writes", len(group)
+                    )
+        return failed
+
+    def _apply_group(self, model_name, method, group):
+        model = self.odoo[model_name]
+        if method == "write":
+            model.write([entry.id for entry in group], group[0].vals)
+            return
+        ids = model.create([entry.vals for entry in group])
+        if isinstance(ids, int):
+            ids = [ids]
+        for entry, id in zip(group, ids):
+            for callback in entry.callbacks:
+                callback(id)
+
+    def flush(self, timeout: float = None):
+        """Blocks until every queued write has been applied.
+
+        Returns `False` if `timeout` seconds passed first.
+        """
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(self._idle, timeout)
+
+    def shutdown(self, timeout: float = None):
+        """Flushes the queue and stops the worker threads."""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        return flushed
+
+    def __len__(self):
+        return len(self._pending) + len(self._in_flight)
+
+    def __repr__(self):
+        return f"<WriteBehindQueue(pending={len(self)})>"
@@ -24,3 +24,14 @@ def app_context(app):
 def request_context(app):
     with app.test_request_context() as request_context:
         yield request_context
+
+
+@pytest.fixture
+def fake_odoo(app):
+    from .fake_odoo import FakeOdoo
+
+    fake_odoo = FakeOdoo()
+    fake_odoo.start()
+    app.config["ODOO_URL"] = fake_odoo.url
+    yield fake_odoo
+    fake_odoo.stop()
@@ -0,0 +1,169 @@
+import socketserver
+import threading
+import time
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+
+class RequestHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+    # Keeps connections open between calls, like Odoo behind a proxy.
+    protocol_version = "HTTP/1.1"
+
+
+class Server(socketserver.ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeOdoo:
+    """A minimal in-process Odoo XML-RPC server for tests.
+
+    Records are kept in `self.records`, a dict mapping model names to dicts
+    of id to values. Only the methods used by the tests are implemented, and
+    domains are ignored. Requests are handled in threads, each call taking
+    at least `latency` seconds.
+
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.external_ids = {}
+        self.calls = []
+        self.latency = 0
+        self._lock = threading.Lock()
+        self.server = Server(
+            ("127.0.0.1", 0),
+            requestHandler=RequestHandler,
+            logRequests=False,
+            allow_none=True,
+        )
+        self.server.register_function(self.version, "version")
+        self.server.register_function(self.authenticate, "authenticate")
+        self.server.register_function(self.execute_kw, "execute_kw")
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def version(self):
+        return {"server_version": "13.0", "protocol_version": 1}
+
+    def authenticate(self, db, username, password, user_agent_env):
+        return 2 if password == "admin" else False
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((model, method))
+            records = self.records.setdefault(model, {})
+            return getattr(self, f"_{method}")(records, *args, **kwargs)
+
+    def _search_read(
+        self,
+        records,
+        domain,
+        fields=None,
+        offset=0,
+        limit=0,
+        order=None,
+        context=None,
+    ):
+        rows = [dict(vals, id=id) for id, vals in sorted(records.items())]
+        if order:
+            field, _, direction = order.partition(" ")
+            rows.sort(
+                key=lambda row: row.get(field), reverse=direction == "desc"
+            )
+        rows = rows[offset : offset + limit if limit else None]
+        if fields:
+            rows = [{f: row.get(f, False) for f in fields} for row in rows]
+        return rows
+
+    def _read(self, records, ids, fields=None):
+        return self._search_read(
+            {id: records[id] for id in ids if id in records}, [], fields
+        )
+
+    def _name_search(
+        self, records, name="", args=None, operator="ilike", limit=100
+    ):
+        rows = [
+            [id, vals.get("display_name", "")]
+            for id, vals in sorted(records.items())
+            if name.lower() in vals.get("display_name", "").lower()
+        ]
+        return rows[:limit]
+
+    def _search_count(self, records, domain):
+        return len(records)
+
+    def _create(self, records, vals):
+        id = max(records, default=0) + 1
+        records[id] = vals
+        return id
+
+    def _write(self, records, ids, vals):
+        for id in ids:
+            records[id].update(vals)
+        return True
+
+    def _load_errors(self, fields, data):
+        # Rows with an empty `name` fail, rolling back the whole call.
+        if "name" not in fields:
+            return []
+        index = fields.index("name")
+        return [
+            {
+                "type": "error",
+                "message": "Missing required value for the field.",
+                "record": row_index,
+                "field": "name",
+            }
+            for row_index, row in enumerate(data)
+            if not row[index]
+        ]
+
+    def _load(self, records, fields, data):
+        messages = self._load_errors(fields, data)
+        if messages:
+            return {"ids": False, "messages": messages}
+        ids = []
+        for row in data:
+            vals = {}
+            id = None
+            external_id = None
+            for field, value in zip(fields, row):
+                if field == "id":
+                    external_id = value
+                    id = self.external_ids.get(value)
+                elif field == ".id":
+                    id = int(value) if value else None
+                elif field.endswith("/.id"):
+                    vals[field[:-4]] = int(value) if value else False
+                else:
+                    vals[field] = value
+            if id in records:
+                records[id].update(vals)
+            else:
+                id = self._create(records, vals)
+            if external_id:
+                self.external_ids[external_id] = id
+            ids.append(id)
+        return {"ids": ids, "messages": []}
+
+    def _unlink(self, records, ids):
+        for id in ids:
+            records.pop(id, None)
+        return True
@@ -0,0 +1,88 @@
+import base64
+import io
+import os
+
+import pytest
+
+from flask_odoo import Odoo, stream
+from flask_odoo.attachment import (
+    Base64Decoder,
+    iter_base64,
+    open_binary,
+    upload_binary,
+)
+
+
+def test_base64_decoder():
+    data = os.urandom(1000)
+    encoded = base64.encodebytes(data).decode("ascii")
+    decoder = Base64Decoder()
+    decoded = b"".join(
+        decoder.decode(encoded[i : i + 7]) for i in range(0, len(encoded), 7)
+    )
+    assert decoded + decoder.flush() == data
+
+
+def test_base64_decoder_truncated():
+    decoder = Base64Decoder()
+    decoder.decode("YWJj" + "YW")
+    with pytest.raises(ValueError):
+        decoder.flush()
+
+
+def test_iter_base64():
+    data = os.urandom(1000)
+    encoded = b"".join(iter_base64(io.BytesIO(data), chunk_size=30))
+    assert encoded == base64.b64encode(data)
+
+
+def test_iter_base64_short_reads():
+    class ShortReader(io.BytesIO):
+        def read(self, size=-1):
+            return super().read(min(size, 7))
+
+    data = os.urandom(1000)
+    encoded = b"".join(iter_base64(ShortReader(data), chunk_size=30))
+    assert encoded == base64.b64encode(data)
+
+
+def test_upload_and_open_binary(app, fake_odoo):
+    data = os.urandom(300_000)
+    odoo = Odoo(app)
+    with app.app_context():
+        id = upload_binary(
+            odoo,
+            "ir.attachment",
+            io.BytesIO(data),
+            "datas",
+            {"name": "random.bin"},
+        )
+        stored = fake_odoo.records["ir.attachment"][id]
+        assert stored["name"] == "random.bin"
+        assert base64.b64decode(stored["datas"]) == data
+        with open_binary(odoo, "ir.attachment", id, "datas") as fileobj:
+            assert fileobj.read() == data
+        with pytest.raises(LookupError):
+            open_binary(odoo, "ir.attachment", id + 1, "datas")
+
+
+def test_attachment_model(app, fake_odoo):
+    odoo = Odoo(app)
+    with app.app_context():
+        attachment = odoo.Attachment.upload(b"hello world", "hello.txt")
+        assert attachment.name == "hello.txt"
+        with odoo.Attachment.open(attachment.id) as fileobj:
+            assert fileobj.read() == b"hello world"
+        chunks = odoo.Attachment.stream(attachment.id, chunk_size=4)
+    assert b"".join(chunks) == b"hello world"
+
+
+def test_attachment_open_gzip_config(app, fake_odoo, mocker):
+    app.config["ODOO_GZIP_RESPONSES"] = False
+    odoo = Odoo(app)
+    post = mocker.patch("flask_odoo.attachment.post", wraps=stream.post)
+    with app.app_context():
+        attachment = odoo.Attachment.upload(b"hello world", "hello.txt")
+        with odoo.Attachment.open(attachment.id) as fileobj:
+            assert fileobj.read() == b"hello world"
+    assert post.call_args[0][3] == {}
@@ -0,0 +1,184 @@
+from unittest.mock import MagicMock
+
+import pytest
+from schematics.types import serializable
+
+from flask_odoo import Odoo
+from flask_odoo.bulk import UpsertResult, load_columns, load_row
+
+
+def make_partner(odoo):
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+        ref = odoo.StringType()
+        active = odoo.BooleanType()
+        country_id = odoo.Many2oneType()
+        category_ids = odoo.One2manyType()
+
+        @serializable
+        def external_id(self):
+            return f"shop.partner_{self.ref}"
+
+    return Partner
+
+
+def test_load_columns_and_row(app):
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+        active = odoo.BooleanType()
+        birthday = odoo.DateType()
+        write_date = odoo.DateTimeType()
+        credit = odoo.FloatType()
+        country_id = odoo.Many2oneType()
+        category_ids = odoo.One2manyType()
+
+    columns = load_columns(Partner)
+    assert [key for name, key, field in columns] == [
+        "name",
+        "active",
+        "birthday",
+        "write_date",
+        "credit",
+        "country_id/.id",
+        "category_ids/.id",
+    ]
+    partner = Partner(
+        {
+            "name": "Odoo",
+            "active": False,
+            "birthday": "2020-01-31",
+            "write_date": "2020-01-31T10:20:30",
+            "credit": 1.5,
+            "country_id": [21, "Belgium"],
+            "category_ids": [1, 2],
+        }
+    )
+    assert load_row(partner, columns) == [
+        "Odoo",
+        "0",
+        "2020-01-31",
+        "2020-01-31 10:20:30",
+        "1.5",
+        "21",
+        "1,2",
+    ]
+    assert load_row(Partner(), columns) == [""] * 7
+
+
+def test_upsert_result():
+    assert UpsertResult(None, 1).ok
+    assert not UpsertResult(None).ok
+    assert UpsertResult(None, 1, [{"type": "warning"}]).ok
+    assert not UpsertResult(None, 1, [{"type": "error"}]).ok
+
+
+def test_bulk_upsert_external_id(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    Partner = make_partner(odoo)
+    partners = [
+        Partner({"name": "Odoo", "ref": "1", "active": True}),
+        Partner({"name": "Flask", "ref": "2", "country_id": 21}),
+    ]
+
+    results = Partner.bulk_upsert(partners)
+
+    assert [result.id for result in results] == [1, 2]
+    assert all(result.ok for result in results)
+    assert [partner.id for partner in partners] == [1, 2]
+    records = fake_odoo.records["res.partner"]
+    assert records[1]["active"] == "1"
+    assert records[2]["country_id"] == 21
+    assert fake_odoo.external_ids == {
+        "shop.partner_1": 1,
+        "shop.partner_2": 2,
+    }
+
+    partners[0].name = "Odoo S.A."
+    results = Partner.bulk_upsert([partners[0], Partner({"ref": "3"})])
+
+    assert [result.id for result in results] == [None, None]
+    assert results[1].messages[0]["field"] == "name"
+    assert results[0].messages == []
+    assert records[1]["name"] == "Odoo"
+
+    results = Partner.bulk_upsert([partners[0]])
+
+    assert results[0].id == 1
+    assert records[1]["name"] == "Odoo S.A."
+    assert len(records) == 2
+
+
+def test_bulk_upsert_by_field(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    Partner = make_partner(odoo)
+    fake_odoo.records["res.partner"] = {5: {"name": "Odoo", "ref": "1"}}
+
+    results = Partner.bulk_upsert(
+        [
+            Partner({"name": "Odoo S.A.", "ref": "1"}),
+            Partner({"name": "Flask", "ref": "2"}),
+        ],
+        key="ref",
+    )
+
+    assert [result.id for result in results] == [5, 6]
+    assert fake_odoo.calls == [
+        ("res.partner", "search_read"),
+        ("res.partner", "load"),
+    ]
+    assert fake_odoo.records["res.partner"][5]["name"] == "Odoo S.A."
+
+
+def test_bulk_upsert_chunks(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    Partner = make_partner(odoo)
+    partners = [
+        Partner({"name": f"Partner {i}", "ref": str(i)}) for i in range(10)
+    ]
+
+    results = Partner.bulk_upsert(partners, chunk_size=3, workers=4)
+
+    assert sorted(result.id for result in results) == list(range(1, 11))
+    assert [result.instance for result in results] == partners
+    assert fake_odoo.calls.count(("res.partner", "load")) == 4
+    for partner, result in zip(partners, results):
+        record = fake_odoo.records["res.partner"][result.id]
+        assert record["name"] == partner.name
+
+
+def test_bulk_upsert_chunks_tenant(app, app_context):
+    odoo = Odoo(app)
+    Partner = make_partner(odoo)
+    tenant = odoo.for_tenant("other", "user", "secret")
+    tenant._uid = 7
+    seen = []
+
+    def execute_kw(model_name, method, args, kwargs):
+        seen.append(odoo.credentials())
+        return {"ids": [1] * len(args[1]), "messages": []}
+
+    odoo.execute_kw = MagicMock(side_effect=execute_kw)
+    partners = [Partner({"name": "Odoo", "ref": str(i)}) for i in range(4)]
+
+    with tenant:
+        Partner.bulk_upsert(partners, chunk_size=2, workers=2)
+
+    assert seen == [("other", 7, "secret")] * 2
+
+
+def test_bulk_upsert_no_external_id(app, app_context):
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+
+    with pytest.raises(ValueError):
+        Partner.bulk_upsert([Partner({"name": "Odoo"})])
@@ -0,0 +1,117 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+from flask_odoo import LocalBus, Odoo
+from flask_odoo.bus import BusListener, OdooBus, WriteDatePoller
+
+
+def test_odoo_on_change(app):
+    odoo = Odoo(app)
+    changes = []
+    partner_changes = []
+
+    @odoo.on_change()
+    def on_any_change(model_name, ids):
+        changes.append((model_name, ids))
+
+    @odoo.on_change("res.partner")
+    def on_partner_change(model_name, ids):
+        partner_changes.append(ids)
+
+    @odoo.on_change()
+    def failing(model_name, ids):
+        raise RuntimeError
+
+    odoo.publish("res.partner", [1])
+    odoo.publish("res.country", [2])
+
+    assert changes == [("res.partner", [1]), ("res.country", [2])]
+    assert partner_changes == [[1]]
+
+
+def test_local_bus():
+    bus = LocalBus()
+    bus.send("res.partner", (1, 2))
+    bus.send("res.country", [3])
+    assert bus.poll() == [("res.partner", [1, 2]), ("res.country", [3])]
+    assert bus.poll() == []
+
+
+def test_odoo_bus(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    fake_odoo.records["bus.bus"] = {
+        1: {"channel": '"flask"', "message": "{}"},
+    }
+    bus = OdooBus(odoo, ["flask"])
+    assert bus.channels == ['"flask"']
+    assert bus.poll() == []
+    assert bus.last_id == 1
+
+    fake_odoo.records["bus.bus"].update(
+        {
+            2: {
+                "channel": '"flask"',
+                "message": json.dumps({"model": "res.partner", "ids": [7]}),
+            },
+            3: {"channel": '"flask"', "message": "not json"},
+            4: {"channel": '"flask"', "message": json.dumps(["other"])},
+        }
+    )
+    assert bus.poll() == [("res.partner", [7])]
+    assert bus.last_id == 4
+    assert bus.poll() == []
+
+
+def test_write_date_poller(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    records = fake_odoo.records["res.partner"] = {
+        1: {"write_date": "2020-01-01 10:00:00"},
+        2: {"write_date": "2020-01-01 10:00:05"},
+    }
+    poller = WriteDatePoller(odoo, ["res.partner"])
+    assert poller.poll() == []
+
+    records[3] = {"write_date": "2020-01-01 10:00:05"}
+    records[1]["write_date"] = "2020-01-01 10:00:09"
+    assert poller.poll() == [("res.partner", [3, 1])]
+    assert poller.poll() == []
+
+    records[2]["write_date"] = "2020-01-01 10:00:09"
+    assert poller.poll() == [("res.partner", [2])]
+    assert poller.cursors["res.partner"] == ("2020-01-01 10:00:09", {1, 2})
+
+
+def test_bus_listener(app):
+    odoo = Odoo(app)
+    received = threading.Event()
+    changes = []
+
+    @odoo.on_change("res.partner")
+    def on_partner_change(model_name, ids):
+        changes.append(ids)
+        received.set()
+
+    failing = MagicMock()
+    failing.poll.side_effect = ConnectionError
+    bus = LocalBus()
+    listener = odoo.start_listener(app, sources=[failing, bus])
+    assert odoo.start_listener(app) is listener
+    listener.interval = 0.01
+    try:
+        bus.send("res.partner", [1])
+        assert received.wait(5)
+    finally:
+        listener.stop(5)
+    assert changes == [[1]]
+    assert failing.poll.called
+
+
+def test_init_app_starts_listener(app, mocker):
+    start = mocker.patch.object(BusListener, "start")
+    app.config["ODOO_BUS_WATCH_MODELS"] = ["res.partner"]
+    odoo = Odoo(app)
+    listener = app.extensions["odoo"]["listener"]
+    start.assert_called_once_with()
+    assert listener.odoo is odoo
+    assert isinstance(listener.sources[0], WriteDatePoller)
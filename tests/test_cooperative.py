@@ -0,0 +1,122 @@
+import time
+import xmlrpc.client
+
+import pytest
+
+from flask_odoo import Odoo, stream
+from flask_odoo.cooperative import create_connection
+
+
+def test_spawn_many(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    fake_odoo.records["res.partner"] = {1: {"name": "Odoo"}}
+
+    results = odoo.spawn_many(
+        [
+            ("res.partner", "search_count", ([],)),
+            ("res.partner", "read", ([1], ["name"])),
+            ("res.country", "search_count", ([],), {}),
+        ],
+        limit=2,
+    )
+
+    assert results == [1, [{"name": "Odoo"}], 0]
+    assert app_context.odoo_uid == 2
+    assert not hasattr(app_context, "odoo_pooled")
+    assert odoo.pool._idle.qsize() == 2
+
+
+def test_spawn_many_error(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+    with pytest.raises(xmlrpc.client.Fault):
+        odoo.spawn_many([("res.partner", "unknown", ())])
+
+
+def test_cooperative_mode(app, app_context, fake_odoo, mocker):
+    gevent = pytest.importorskip("gevent")
+    import gevent.queue
+    import gevent.ssl
+
+    app.config["ODOO_CONCURRENCY"] = "gevent"
+    odoo = Odoo(app)
+    assert odoo.cooperative
+    assert isinstance(odoo.pool._idle, gevent.queue.LifoQueue)
+    object = odoo.create_object_proxy()
+    transport = object._ServerProxy__transport
+    connection = transport.make_connection("localhost")
+    assert connection._create_connection is create_connection
+    assert isinstance(odoo.create_ssl_context(), gevent.ssl.SSLContext)
+
+    fake_odoo.records["res.partner"] = {1: {"name": "Odoo"}}
+    assert odoo["res.partner"].search_count([]) == 1
+    assert not hasattr(app_context, "odoo_object")
+    assert odoo.spawn_many(
+        [("res.partner", "search_count", ([],))] * 3, limit=2
+    ) == [1, 1, 1]
+
+    # Streamed reads and attachments connect with gevent sockets too.
+    connection = stream.create_connection(fake_odoo.url, cooperative=True)
+    assert connection._create_connection is create_connection
+    spy = mocker.spy(stream.http.client.HTTPConnection, "connect")
+    rows = odoo["res.partner"].search_read.stream([], fields=["name"])
+    assert [row["name"] for row in rows] == ["Odoo"]
+    attachment = odoo.Attachment.upload(b"hello world", "hello.txt")
+    with odoo.Attachment.open(attachment.id) as fileobj:
+        assert fileobj.read() == b"hello world"
+    for call in spy.call_args_list:
+        assert call.args[0]._create_connection is create_connection
+    assert spy.call_count == 3
+
+
+def test_cooperative_locks(app, app_context, fake_odoo, mocker):
+    gevent = pytest.importorskip("gevent")
+    import gevent.lock
+
+    app.config["ODOO_CONCURRENCY"] = "gevent"
+    odoo = Odoo(app)
+
+    class Country(odoo.Model):
+        _name = "res.country"
+        _name_index = True
+
+    fake_odoo.records["res.country"] = {
+        1: {"display_name": "New Zealand", "write_date": "2020-01-01"},
+    }
+    tenant = odoo.for_tenant(app.config["ODOO_DB"], "admin", "admin")
+    assert isinstance(tenant._lock, gevent.lock.RLock)
+    authenticate = mocker.spy(tenant, "authenticate")
+
+    def call():
+        # Greenlets authenticate the new tenant and build the name index
+        # concurrently, each waiting on the other's calls.
+        with app.app_context(), tenant:
+            return Country.name_search("zea")
+
+    greenlets = [gevent.spawn(call) for _ in range(5)]
+    gevent.joinall(greenlets, timeout=10, raise_error=True)
+    assert [greenlet.value for greenlet in greenlets] == [
+        [[1, "New Zealand"]]
+    ] * 5
+    assert authenticate.call_count == 1
+
+
+def test_spawn_many_benchmark(app, app_context, fake_odoo):
+    pytest.importorskip("gevent")
+    app.config["ODOO_CONCURRENCY"] = "gevent"
+    app.config["ODOO_POOL_SIZE"] = 100
+    odoo = Odoo(app)
+    fake_odoo.latency = 0.005
+    rps = {}
+    for limit in [1, 10, 100]:
+        count = 20 * limit
+        calls = [("res.partner", "search_count", ([],))] * count
+        # Opens the pool's connections before timing.
+        odoo.spawn_many(calls[:limit], limit=limit)
+        start = time.perf_counter()
+        results = odoo.spawn_many(calls, limit=limit)
+        rps[limit] = count / (time.perf_counter() - start)
+        assert results == [0] * count
+    print()
+    for limit, value in rps.items():
+        print(f"{limit:>3} greenlets: {value:8.0f} requests/s")
+    assert rps[1] < rps[10] < rps[100]
@@ -1,4 +1,6 @@
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
+
+import pytest
 
 from flask_odoo import ObjectProxy, Odoo
 
@@ -8,18 +10,29 @@ def test_odoo_init(app, mocker):
     init_app_mock = mocker.patch.object(Odoo, "init_app")
     odoo = Odoo(app)
     assert odoo.app == app
-    make_model_base_mock.assert_called_with(odoo)
+    make_model_base_mock.assert_not_called()
     assert odoo.Model == make_model_base_mock.return_value
+    make_model_base_mock.assert_called_once_with(odoo)
     init_app_mock.assert_called_with(app)
 
 
+def test_odoo_types(app):
+    from flask_odoo import types
+
+    odoo = Odoo(app)
+    assert odoo.StringType is types.StringType
+    assert odoo.Many2oneType is types.Many2oneType
+    with pytest.raises(AttributeError):
+        odoo.UnknownType
+
+
 def test_odoo_common(app, app_context, mocker):
-    server_proxy_mock = mocker.patch("flask_odoo.xmlrpc.client.ServerProxy")
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
     odoo = Odoo(app)
     server_proxy = odoo.common
     assert app_context.odoo_common == server_proxy
     server_proxy_mock.assert_called_with(
-        "http://localhost:8069/xmlrpc/2/common"
+        "http://localhost:8069/xmlrpc/2/common", transport=ANY
     )
 
 
@@ -44,12 +57,12 @@ def test_odoo_uid(app, app_context, mocker):
 
 
 def test_odoo_object(app, app_context, mocker):
-    server_proxy_mock = mocker.patch("flask_odoo.xmlrpc.client.ServerProxy")
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
     odoo = Odoo(app)
     server_proxy = odoo.object
     assert app_context.odoo_object == server_proxy
     server_proxy_mock.assert_called_with(
-        "http://localhost:8069/xmlrpc/2/object"
+        "http://localhost:8069/xmlrpc/2/object", transport=ANY
     )
 
 
@@ -91,11 +104,22 @@ def test_object_proxy_method_init():
 
 def test_object_proxy_method_call(app, app_context):
     odoo_mock = MagicMock()
-    odoo_mock.uid = 1
-    odoo_mock.object = MagicMock()
     method = ObjectProxy.Method(odoo_mock, "test.model", "test_method")
     method("arg1", kwarg1="test_kwarg")
-    odoo_mock.object.execute_kw.assert_called_with(
+    odoo_mock.execute_kw.assert_called_with(
+        "test.model", "test_method", ("arg1",), {"kwarg1": "test_kwarg"}
+    )
+
+
+def test_odoo_execute_kw(app, app_context):
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    app_context.odoo_object = MagicMock()
+    odoo.execute_kw(
+        "test.model", "test_method", ("arg1",), {"kwarg1": "test_kwarg"}
+    )
+    app_context.odoo_object.execute_kw.assert_called_with(
         "odoo",
         1,
         "admin",
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+# Budget for `import flask_odoo` on top of an already imported Flask, in
+# microseconds. Generous enough for slow CI machines, yet far below the
+# cost of importing schematics and xmlrpc.client eagerly.
+IMPORT_TIME_BUDGET = 50_000
+
+
+def import_times(statement):
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        check=True,
+        stderr=subprocess.PIPE,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        universal_newlines=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_is_lazy():
+    times = import_times("import flask; import flask_odoo")
+    assert "flask_odoo" in times
+    for name in ["schematics", "xmlrpc.client", "flask_odoo.model"]:
+        assert name not in times
+
+
+def test_import_time_budget():
+    times = import_times("import flask; import flask_odoo")
+    assert times["flask_odoo"] < IMPORT_TIME_BUDGET
+
+
+def test_lazy_attributes():
+    times = import_times("import flask_odoo; flask_odoo.types")
+    assert "schematics" in times
@@ -1,6 +1,11 @@
 from unittest.mock import MagicMock
 
+import pytest
+import schematics.exceptions
 import schematics.models
+import schematics.schema
+import schematics.transforms
+import schematics.types
 
 from flask_odoo import Odoo
 from flask_odoo.model import make_model_base
@@ -14,6 +19,58 @@ def test_make_model_base():
     assert Model._odoo is odoo_mock
 
 
+def test_model_schema_compiled_on_first_use(app, app_context):
+    Model = make_model_base(MagicMock())
+
+    class Partner(Model):
+        name = schematics.types.StringType(required=True)
+        email = schematics.types.StringType(serialized_name="email_from")
+
+        class Options:
+            roles = {"public": schematics.transforms.blacklist("email")}
+
+        def validate_name(self, data, value):
+            if value == "invalid":
+                raise schematics.exceptions.ValidationError("Invalid name.")
+
+        @serializable
+        def label(self):
+            return f"{self.name} <{self.email}>"
+
+    class Company(Partner):
+        name = schematics.types.StringType()
+        vat = schematics.types.StringType()
+
+    assert not isinstance(
+        Partner.__dict__["_schema"], schematics.schema.Schema
+    )
+    assert not isinstance(
+        Company.__dict__["_schema"], schematics.schema.Schema
+    )
+
+    company = Company({"name": "Odoo", "email_from": "info@odoo.com"})
+    assert isinstance(Company.__dict__["_schema"], schematics.schema.Schema)
+    assert isinstance(Partner.__dict__["_schema"], schematics.schema.Schema)
+    # Redeclared fields move to the end, as with schematics' metaclass.
+    assert list(Company._schema.fields) == [
+        "id",
+        "email",
+        "label",
+        "name",
+        "vat",
+    ]
+    assert company.to_primitive(role="public") == {
+        "id": None,
+        "name": "Odoo",
+        "label": "Odoo <info@odoo.com>",
+        "vat": None,
+    }
+    with pytest.raises(schematics.exceptions.DataError):
+        Company({"name": "invalid"}).validate()
+    with pytest.raises(schematics.exceptions.DataError):
+        Partner({}).validate()
+
+
 def test_base_model_no_name(app, app_context):
     odoo_mock = MagicMock()
     Model = make_model_base(odoo_mock)
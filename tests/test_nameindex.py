@@ -0,0 +1,159 @@
+import pytest
+
+from flask_odoo import Odoo, nameindex
+from flask_odoo.nameindex import NameIndex
+
+COUNTRIES = [
+    {"id": 1, "display_name": "New Zealand", "write_date": "2020-01-01"},
+    {"id": 2, "display_name": "Netherlands", "write_date": "2020-01-03"},
+    {"id": 3, "display_name": "Papua New Guinea", "write_date": "2020-01-02"},
+    {"id": 4, "display_name": "Zambia", "write_date": "2020-01-01"},
+]
+
+
+def test_name_index_search():
+    index = NameIndex()
+    index.update(COUNTRIES)
+    assert len(index) == 4
+    assert index.write_date == "2020-01-03"
+    assert index.search("ne") == [
+        [2, "Netherlands"],
+        [3, "Papua New Guinea"],
+        [1, "New Zealand"],
+    ]
+    assert index.search("  NEW   z") == [[1, "New Zealand"]]
+    assert index.search("land") == [[2, "Netherlands"], [1, "New Zealand"]]
+    assert index.search("z", limit=1) == [[4, "Zambia"]]
+    assert index.search("a", limit=2) == [
+        [2, "Netherlands"],
+        [1, "New Zealand"],
+    ]
+    assert index.search("xyz") == []
+    assert index.search("", limit=2) == [
+        [2, "Netherlands"],
+        [1, "New Zealand"],
+    ]
+
+
+def test_name_index_update():
+    index = NameIndex()
+    index.update(COUNTRIES)
+    index.update([{"id": 1, "display_name": "Aotearoa"}])
+    assert index.search("new") == [[3, "Papua New Guinea"]]
+    assert index.search("aot") == [[1, "Aotearoa"]]
+    index.remove([3, 5])
+    assert index.search("new") == []
+    index.update([{"id": 2, "display_name": False}])
+    assert index.search("") == [[1, "Aotearoa"], [4, "Zambia"]]
+
+
+@pytest.mark.parametrize("bulk_ratio", [1, 16])
+def test_name_index_update_batches(monkeypatch, bulk_ratio):
+    # Small batches are inserted in place, large ones sorted in bulk.
+    monkeypatch.setattr(nameindex, "BULK_RATIO", bulk_ratio)
+    index = NameIndex()
+    index.update(COUNTRIES)
+    index.update(
+        [
+            {"id": 1, "display_name": "Aotearoa"},
+            {"id": 5, "display_name": "Niger"},
+            {"id": 5, "display_name": "Nigeria"},
+        ]
+    )
+    assert index.search("n") == [
+        [2, "Netherlands"],
+        [3, "Papua New Guinea"],
+        [5, "Nigeria"],
+    ]
+    assert sorted(index._suffixes) == index._suffixes
+    assert len(index._suffixes) == 7
+
+
+def test_model_name_search_indexed(app, app_context, fake_odoo):
+    app.config["ODOO_NAME_INDEX_PAGE_SIZE"] = 3
+    odoo = Odoo(app)
+
+    class Country(odoo.Model):
+        _name = "res.country"
+        _name_index = True
+
+    fake_odoo.records["res.country"] = {
+        row["id"]: dict(row) for row in COUNTRIES
+    }
+    assert Country.name_search("new") == [
+        [3, "Papua New Guinea"],
+        [1, "New Zealand"],
+    ]
+    assert fake_odoo.calls == [("res.country", "search_read")] * 2
+    assert Country.name_search("zam", limit=1) == [[4, "Zambia"]]
+    assert len(fake_odoo.calls) == 2
+
+    fake_odoo.records["res.country"][4]["display_name"] = "Zimbabwe"
+    app.config["ODOO_NAME_INDEX_TTL"] = 0
+    assert Country.name_search("zam") == []
+    assert Country.name_search("zim") == [[4, "Zimbabwe"]]
+
+    fake_odoo.calls.clear()
+    app.config["ODOO_NAME_INDEX_TTL"] = None
+    fake_odoo.records["res.country"][4]["display_name"] = "Zambia"
+    assert Country.name_search("zam") == []
+    Country.refresh_name_index()
+    assert Country.name_search("zam") == [[4, "Zambia"]]
+    assert fake_odoo.calls == [("res.country", "search_read")] * 2
+
+
+def test_model_name_search_server(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+
+    class Country(odoo.Model):
+        _name = "res.country"
+
+    class IndexedCountry(odoo.Model):
+        _name = "res.country"
+        _name_index = True
+
+    fake_odoo.records["res.country"] = {
+        row["id"]: dict(row) for row in COUNTRIES
+    }
+    assert Country.name_search("zea") == [[1, "New Zealand"]]
+    assert IndexedCountry.name_search("zea", operator="=ilike") == [
+        [1, "New Zealand"]
+    ]
+    assert IndexedCountry.name_search("zea", args=[["code", "=", "NZ"]]) == [
+        [1, "New Zealand"]
+    ]
+    assert fake_odoo.calls == [("res.country", "name_search")] * 3
+
+
+def test_model_name_search_domain(app, app_context, mocker):
+    odoo = Odoo(app)
+    execute_kw = mocker.patch.object(Odoo, "execute_kw", return_value=[])
+
+    class Country(odoo.Model):
+        _name = "res.country"
+        _domain = [["active", "=", True]]
+        _name_index = True
+
+    Country.name_search("zea")
+    execute_kw.assert_called_once_with(
+        "res.country",
+        "search_read",
+        ([["active", "=", True]],),
+        {
+            "fields": ["id", "display_name", "write_date"],
+            "offset": 0,
+            "limit": 1000,
+            "order": "id",
+        },
+    )
+    Country.name_search("zea", args=[["code", "=", "NZ"]])
+    execute_kw.assert_called_with(
+        "res.country",
+        "name_search",
+        ("zea",),
+        {
+            "args": [["active", "=", True], ["code", "=", "NZ"]],
+            "operator": "ilike",
+            "limit": 100,
+        },
+    )
@@ -0,0 +1,101 @@
+from flask_odoo import Odoo
+from flask_odoo.profiling import Profile, current_profile, phase
+
+
+def test_profile_phases():
+    profile = Profile()
+    with profile.phase("res.partner.read"):
+        with profile.phase("server"):
+            pass
+        with profile.phase("server"):
+            pass
+    profile.add("hydrate", 0.5)
+
+    assert list(profile.totals) == ["server", "res.partner.read", "hydrate"]
+    assert profile.totals["server"][1] == 2
+    assert profile.as_dict()["hydrate"] == {"seconds": 0.5, "count": 1}
+    assert list(profile.stacks) == [
+        "res.partner.read;server",
+        "res.partner.read",
+        "hydrate",
+    ]
+    server = profile.totals["server"][0]
+    read = profile.totals["res.partner.read"][0]
+    assert abs(profile.stacks["res.partner.read"] - (read - server)) < 1e-9
+
+
+def test_profile_export():
+    profile = Profile()
+    profile.add("hydrate", 0.002)
+    profile.add("server", 0.0125)
+    profile.add("res.partner.read", 0.1)
+
+    assert profile.server_timing() == (
+        "odoo.server;dur=12.50, odoo.hydrate;dur=2.00"
+    )
+    assert profile.collapsed() == (
+        "hydrate 2000\nserver 12500\nres.partner.read 100000"
+    )
+
+
+def test_phase_without_profile(app_context):
+    assert current_profile() is None
+    with phase("server"):
+        pass
+
+
+def test_odoo_start_profile(app, app_context, fake_odoo):
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+
+    fake_odoo.records["res.partner"] = {1: {"name": "Odoo"}}
+    profile = odoo.start_profile()
+    assert odoo.start_profile() is profile
+    assert current_profile() is profile
+
+    Partner.search_read()
+
+    for name in ["authenticate", "connect", "send", "server", "unmarshal"]:
+        assert name in profile.totals
+    stacks = profile.collapsed()
+    assert "Partner.search_read;res.partner.search_read;server " in stacks
+    assert "Partner.search_read;hydrate " in stacks
+    assert "res.partner.search_read;authenticate;unmarshal " in stacks
+    # Sending is timed apart from connecting, not nested in it.
+    assert ";connect;" not in stacks
+    assert "Partner.search_read;res.partner.search_read;send " in stacks
+
+
+def test_odoo_server_timing(app, fake_odoo):
+    app.config["ODOO_PROFILE_SAMPLE_RATE"] = 1.0
+    odoo = Odoo(app)
+    profiles = []
+    odoo.profile_handler(profiles.append)
+
+    with app.test_request_context():
+        app.preprocess_request()
+        count = odoo["res.partner"].search_count([])
+        response = app.process_response(app.make_response(str(count)))
+
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("odoo.authenticate;dur=")
+    assert "odoo.server;dur=" in server_timing
+    assert len(profiles) == 1
+
+
+def test_odoo_not_profiled(app, fake_odoo):
+    odoo = Odoo(app)
+    profiles = []
+    odoo.profile_handler(profiles.append)
+
+    with app.test_request_context():
+        app.preprocess_request()
+        count = odoo["res.partner"].search_count([])
+        response = app.process_response(app.make_response(str(count)))
+
+    assert "Server-Timing" not in response.headers
+    assert profiles == []
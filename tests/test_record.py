@@ -0,0 +1,104 @@
+import gc
+import tracemalloc
+from unittest.mock import MagicMock
+
+import pytest
+
+from flask_odoo import Odoo
+from flask_odoo.model import make_model_base
+from flask_odoo.record import make_record_class
+from flask_odoo.types import BooleanType, Many2oneType, StringType
+
+
+def make_partner_model():
+    Model = make_model_base(MagicMock())
+
+    class Partner(Model):
+        _name = "res.partner"
+
+        name = StringType()
+        email = StringType()
+        is_active = BooleanType(serialized_name="active")
+        parent_id = Many2oneType()
+
+    return Partner
+
+
+def make_rows(count):
+    return [
+        {
+            "id": i,
+            "name": f"Partner {i}",
+            "email": False,
+            "active": True,
+            "parent_id": [1, "Odoo"],
+        }
+        for i in range(count)
+    ]
+
+
+def test_record_from_row():
+    Partner = make_partner_model()
+    Record = make_record_class(Partner)
+    record = Record.from_row(make_rows(1)[0])
+    assert record.id == 0
+    assert record.name == "Partner 0"
+    assert record.email is None
+    assert record.is_active is True
+    assert record.parent_id == [1, "Odoo"]
+    assert repr(record) == "<PartnerRecord(id=0)>"
+    with pytest.raises(AttributeError):
+        record.name = "changed"
+
+
+def test_record_to_model():
+    Partner = make_partner_model()
+    record = make_record_class(Partner).from_row(make_rows(1)[0])
+    partner = record.to_model()
+    assert isinstance(partner, Partner)
+    assert partner == Partner(make_rows(1)[0])
+
+
+def test_search_read_lightweight(app, app_context):
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    app_context.odoo_object = MagicMock()
+    app_context.odoo_object.execute_kw.return_value = make_rows(2)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+
+    records = Partner.search_read(lightweight=True)
+    assert [record.id for record in records] == [0, 1]
+    assert records[1].name == "Partner 1"
+    assert Partner._record_class() is type(records[0])
+
+
+def measure(function, rows):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function(rows)
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def test_record_memory_benchmark():
+    Partner = make_partner_model()
+    Record = make_record_class(Partner)
+    rows = make_rows(10_000)
+    model_size = measure(lambda rows: [Partner(row) for row in rows], rows)
+    record_size = measure(
+        lambda rows: [Record.from_row(row) for row in rows], rows
+    )
+    print(
+        f"\n10000 rows: models {model_size / 1024:.0f} KiB, "
+        f"records {record_size / 1024:.0f} KiB"
+    )
+    assert record_size * 3 < model_size
@@ -0,0 +1,141 @@
+import socket
+from unittest.mock import ANY, MagicMock
+
+import pytest
+
+from flask_odoo import Odoo
+from flask_odoo.pool import ProxyPool
+from flask_odoo.routing import Node, NodeSet
+
+
+def test_node_track():
+    node = Node("http://odoo-1:8069")
+    with node.track():
+        assert node.outstanding == 1
+    assert node.outstanding == 0
+
+
+def test_node_invalid_role():
+    with pytest.raises(ValueError):
+        Node("http://odoo-1:8069", role="standby")
+
+
+def test_node_ejection(mocker):
+    monotonic_mock = mocker.patch(
+        "flask_odoo.routing.time.monotonic", return_value=100.0
+    )
+    node = Node("http://odoo-1:8069", max_failures=2, eject_seconds=10)
+    node.mark_failure()
+    assert node.available
+    node.mark_failure()
+    assert not node.available
+    monotonic_mock.return_value = 111.0
+    assert node.available
+    node.mark_success()
+    assert node.failures == 0
+
+
+def test_node_set_requires_primary():
+    with pytest.raises(ValueError):
+        NodeSet([Node("http://replica:8069", role="replica")])
+
+
+def test_node_set_pick_routes_by_method():
+    primary = Node("http://primary:8069")
+    replica = Node("http://replica:8069", role="replica")
+    nodes = NodeSet([primary, replica])
+    assert nodes.pick("search_read") is replica
+    assert nodes.pick("fields_get") is replica
+    assert nodes.pick("write") is primary
+    assert nodes.pick("check_access_rights") is primary
+
+
+def test_node_set_pick_least_outstanding():
+    replica1 = Node("http://replica-1:8069", role="replica")
+    replica2 = Node("http://replica-2:8069", role="replica")
+    nodes = NodeSet([Node("http://primary:8069"), replica1, replica2])
+    with replica1.track():
+        assert nodes.pick("read") is replica2
+
+
+def test_node_set_pick_falls_back_to_primary():
+    primary = Node("http://primary:8069")
+    replica = Node("http://replica:8069", role="replica", max_failures=1)
+    nodes = NodeSet([primary, replica])
+    replica.mark_failure()
+    assert nodes.pick("search_count") is primary
+
+
+def test_node_set_check_health():
+    healthy = Node("http://primary:8069", max_failures=1)
+    failing = Node("http://replica:8069", role="replica", max_failures=1)
+    healthy.mark_failure()
+
+    def version(node):
+        if node is failing:
+            raise socket.timeout()
+        return {"server_version": "13.0"}
+
+    NodeSet([healthy, failing]).check_health(version)
+    assert healthy.available
+    assert not failing.available
+
+
+def test_proxy_pool_reuses_proxies():
+    factory = MagicMock(side_effect=[MagicMock(), MagicMock()])
+    pool = ProxyPool(factory, maxsize=1)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert factory.call_count == 1
+
+
+def test_proxy_pool_discards_broken_proxies():
+    factory = MagicMock(side_effect=[MagicMock(), MagicMock()])
+    pool = ProxyPool(factory)
+    with pytest.raises(ConnectionResetError):
+        with pool.connection() as first:
+            raise ConnectionResetError()
+    with pool.connection() as second:
+        pass
+    assert first is not second
+
+
+def test_odoo_routes_to_nodes(app, app_context, mocker):
+    app.config["ODOO_URL"] = ""
+    app.config["ODOO_NODES"] = [
+        "http://primary:8069",
+        {"url": "http://replica:8069", "role": "replica"},
+    ]
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    odoo["res.partner"].search_read([])
+    server_proxy_mock.assert_called_with(
+        "http://replica:8069/xmlrpc/2/object", transport=ANY
+    )
+    odoo["res.partner"].write([1], {"name": "test"})
+    server_proxy_mock.assert_called_with(
+        "http://primary:8069/xmlrpc/2/object", transport=ANY
+    )
+    assert odoo.url == "http://primary:8069"
+
+
+def test_odoo_ejects_failing_node(app, app_context, mocker):
+    app.config["ODOO_NODES"] = ["http://primary:8069"]
+    app.config["ODOO_NODE_MAX_FAILURES"] = 1
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    server_proxy_mock.return_value.execute_kw.side_effect = (
+        ConnectionRefusedError()
+    )
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    with pytest.raises(ConnectionRefusedError):
+        odoo["res.partner"].create({"name": "test"})
+    assert not odoo.nodes.primaries[0].available
+    odoo.check_nodes()
+    assert odoo.nodes.primaries[0].available
@@ -0,0 +1,263 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from flask_odoo import Odoo
+from flask_odoo.snapshot import (
+    Column,
+    Snapshot,
+    build_snapshot,
+    open_snapshot,
+    write_snapshot,
+)
+
+COUNTRIES = [
+    {
+        "id": 21,
+        "code": "BE",
+        "name": "Belgium",
+        "active": True,
+        "rate": 0.21,
+        "currency_id": [1, "EUR"],
+        "phone_code": 32,
+    },
+    {
+        "id": 3,
+        "code": "ZA",
+        "name": "South Africa",
+        "active": True,
+        "rate": False,
+        "currency_id": [2, "ZAR"],
+        "phone_code": 27,
+    },
+    {
+        "id": 7,
+        "code": "FR",
+        "name": "France",
+        "active": False,
+        "rate": 0.2,
+        "currency_id": [1, "EUR"],
+        "phone_code": False,
+    },
+]
+
+
+def make_columns():
+    return [
+        Column("id", "id", "int"),
+        Column("code", "code", "str"),
+        Column("name", "name", "str"),
+        Column("is_active", "active", "bool"),
+        Column("rate", "rate", "float"),
+        Column("currency_id", "currency_id", "many2one"),
+        Column("phone_code", "phone_code", "int"),
+    ]
+
+
+def test_column_round_trip():
+    for kind, value in [
+        ("bool", False),
+        ("int", -5),
+        ("float", 1.5),
+        ("str", "Österreich"),
+        ("many2one", [1, "EUR"]),
+        ("json", {"a": [1, 2]}),
+        ("str", None),
+    ]:
+        column = Column("field", "field", kind)
+        column.fit(value)
+        cell = column.encode(value)
+        assert len(cell) == column.width
+        assert column.decode(cell) == value
+
+
+def test_column_coerce():
+    assert Column("id", "id", "int").coerce("21") == 21
+    assert Column("id", "id", "int").coerce(21.0) == 21
+    assert Column("rate", "rate", "float").coerce("0.5") == 0.5
+    assert Column("code", "code", "str").coerce(False) is False
+    assert Column("c", "c", "many2one").coerce("1") == 1
+    assert Column("c", "c", "many2one").coerce(("1", "EUR")) == [1, "EUR"]
+    for kind, value in [
+        ("int", "BE"),
+        ("int", True),
+        ("int", 1.5),
+        ("float", "high"),
+        ("str", 5),
+        ("bool", "yes"),
+        ("many2one", [1]),
+    ]:
+        with pytest.raises(ValueError):
+            Column("field", "field", kind).coerce(value)
+
+
+def test_snapshot_lookups(tmp_path):
+    path = str(tmp_path / "country.snap")
+    write_snapshot(path, "res.country", make_columns(), COUNTRIES)
+    snapshot = Snapshot(path)
+    assert len(snapshot) == 3
+    assert snapshot.get(21)["name"] == "Belgium"
+    assert snapshot.get(7)["rate"] == 0.2
+    assert snapshot.get(3)["rate"] is None
+    assert snapshot.get(3)["currency_id"] == [2, "ZAR"]
+    assert snapshot.get(5) is None
+    assert snapshot.get(100) is None
+    assert [row["id"] for row in snapshot.find({"currency_id": 1})] == [7, 21]
+    assert snapshot.find({"code": "ZA"})[0]["phone_code"] == 27
+    assert snapshot.find({"phone_code": False})[0]["id"] == 7
+    assert snapshot.find({"active": False, "code": "BE"}) == []
+    assert len(snapshot.find({}, limit=2)) == 2
+    snapshot.close()
+
+
+def test_open_snapshot_reloads_replaced_file(tmp_path):
+    path = str(tmp_path / "country.snap")
+    assert open_snapshot(path) is None
+    write_snapshot(path, "res.country", make_columns(), COUNTRIES[:1])
+    snapshot = open_snapshot(path)
+    assert open_snapshot(path) is snapshot
+    write_snapshot(path, "res.country", make_columns(), COUNTRIES)
+    assert len(open_snapshot(path)) == 3
+    assert [f for f in os.listdir(tmp_path)] == ["country.snap"]
+
+
+def make_country_model(odoo, path):
+    class Country(odoo.Model):
+        _name = "res.country"
+        _snapshot = path
+
+        code = odoo.StringType()
+        name = odoo.StringType()
+        is_active = odoo.BooleanType(serialized_name="active")
+        currency_id = odoo.Many2oneType()
+
+    return Country
+
+
+def test_build_snapshot(app, app_context, tmp_path):
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    app_context.odoo_object = MagicMock()
+    app_context.odoo_object.execute_kw.side_effect = [
+        COUNTRIES[:2],
+        COUNTRIES[2:],
+    ]
+    path = str(tmp_path / "country.snap")
+    Country = make_country_model(odoo, path)
+    assert build_snapshot(Country, path, page_size=2) == 3
+    app_context.odoo_object.execute_kw.assert_called_with(
+        "odoo",
+        1,
+        "admin",
+        "res.country",
+        "search_read",
+        ([],),
+        {
+            "fields": ["id", "code", "name", "active", "currency_id"],
+            "offset": 2,
+            "limit": 2,
+            "order": "id",
+        },
+    )
+    assert Snapshot(path).get(21)["code"] == "BE"
+
+
+def test_model_served_from_snapshot(app, app_context, tmp_path):
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    app_context.odoo_object = MagicMock()
+    app_context.odoo_object.execute_kw.return_value = [
+        {
+            key: row[key]
+            for key in ["id", "code", "name", "active", "currency_id"]
+        }
+        for row in COUNTRIES
+    ]
+    path = str(tmp_path / "country.snap")
+    Country = make_country_model(odoo, path)
+    Country.refresh_snapshot()
+    app_context.odoo_object.execute_kw.reset_mock()
+
+    country = Country.search_by_id(3)
+    assert country.name == "South Africa"
+    assert Country.search_by_id(4) is None
+    countries = Country.search_read([["currency_id", "=", 1]])
+    assert [c.code for c in countries] == ["FR", "BE"]
+    assert not countries[0].is_active
+    records = Country.search_read([("code", "=", "BE")], lightweight=True)
+    assert records[0].currency_id == [1, "EUR"]
+    app_context.odoo_object.execute_kw.assert_not_called()
+
+    Country.search_read([["name", "ilike", "bel"]])
+    app_context.odoo_object.execute_kw.assert_called_once()
+
+
+def test_model_snapshot_coerces_values(app, app_context, tmp_path):
+    odoo = Odoo(app)
+    app_context.odoo_common = MagicMock()
+    app_context.odoo_common.authenticate.return_value = 1
+    app_context.odoo_object = MagicMock()
+    app_context.odoo_object.execute_kw.return_value = [
+        {
+            key: row[key]
+            for key in ["id", "code", "name", "active", "currency_id"]
+        }
+        for row in COUNTRIES
+    ]
+    Country = make_country_model(odoo, str(tmp_path / "country.snap"))
+    Country.refresh_snapshot()
+    app_context.odoo_object.execute_kw.reset_mock()
+
+    assert Country.search_by_id("21").code == "BE"
+    countries = Country.search_read([["currency_id", "=", "2"]])
+    assert [c.code for c in countries] == ["ZA"]
+    app_context.odoo_object.execute_kw.assert_not_called()
+
+    # Values that do not fit a column are left to Odoo.
+    app_context.odoo_object.execute_kw.return_value = []
+    assert Country.search_read([["name", "=", 5]]) == []
+    assert Country.search_read([["active", "=", "yes"]]) == []
+    assert Country.search_by_id("BE") is None
+    assert app_context.odoo_object.execute_kw.call_count == 3
+
+
+def test_model_snapshot_per_tenant(app, app_context, tmp_path, mocker):
+    odoo = Odoo(app)
+    tenant = odoo.for_tenant("acme", "admin", "secret")
+    rows = {
+        None: [{"id": 1, "code": "BE", "name": "Belgium"}],
+        "acme": [{"id": 1, "code": "FR", "name": "France"}],
+    }
+
+    def execute_kw(model_name, method, args, kwargs):
+        return rows[odoo.tenant and odoo.tenant.db]
+
+    execute_kw = mocker.patch.object(
+        Odoo, "execute_kw", side_effect=execute_kw
+    )
+    Country = make_country_model(odoo, str(tmp_path / "country.snap"))
+    Country.refresh_snapshot()
+    assert Country.search_by_id(1).code == "BE"
+    with tenant:
+        # Not answered with the rows of the app's database.
+        assert Country.search_by_id(1).code == "FR"
+        with pytest.raises(RuntimeError):
+            Country.refresh_snapshot()
+    assert execute_kw.call_count == 2
+
+    Country._snapshot = str(tmp_path / "country-{db}.snap")
+    Country.refresh_snapshot()
+    with tenant:
+        Country.refresh_snapshot()
+        execute_kw.reset_mock()
+        assert Country.search_by_id(1).code == "FR"
+    assert Country.search_by_id(1).code == "BE"
+    execute_kw.assert_not_called()
+    assert sorted(os.listdir(tmp_path)) == [
+        "country-acme.snap",
+        "country-odoo.snap",
+        "country.snap",
+    ]
@@ -0,0 +1,91 @@
+import xmlrpc.client
+
+import pytest
+
+from flask_odoo import Odoo
+from flask_odoo.stream import make_streaming_parser, stream_call
+
+
+def feed(data, chunk_size):
+    parser, unmarshaller = make_streaming_parser()
+    received = []
+    for start in range(0, len(data), chunk_size):
+        parser.Parse(data[start : start + chunk_size], False)
+        received.append(len(unmarshaller.records))
+    parser.Parse(b"", True)
+    return unmarshaller, received
+
+
+def test_streaming_parser_yields_structs_early():
+    rows = [{"id": i, "name": f"rec{i}", "tags": [1, 2]} for i in range(10)]
+    data = xmlrpc.client.dumps((rows,), methodresponse=True).encode()
+    unmarshaller, received = feed(data, 64)
+    assert 0 < received[len(received) // 2] < 10
+    assert list(unmarshaller.records) == rows
+    assert unmarshaller.close() == ([],)
+
+
+def test_streaming_parser_nested_structs():
+    result = {"ids": [1, 2], "messages": [{"type": "error"}]}
+    data = xmlrpc.client.dumps((result,), methodresponse=True).encode()
+    unmarshaller, received = feed(data, 16)
+    assert not unmarshaller.records
+    assert unmarshaller.close() == (result,)
+
+
+def test_streaming_parser_struct_of_structs():
+    result = {"a": {"b": 1}, "c": 2}
+    data = xmlrpc.client.dumps((result,), methodresponse=True).encode()
+    unmarshaller, received = feed(data, 16)
+    assert not unmarshaller.records
+    assert unmarshaller.close() == (result,)
+
+
+def test_streaming_parser_fault():
+    fault = xmlrpc.client.Fault(1, "AccessError")
+    data = xmlrpc.client.dumps(fault, methodresponse=True).encode()
+    unmarshaller, received = feed(data, 16)
+    with pytest.raises(xmlrpc.client.Fault):
+        unmarshaller.close()
+
+
+def test_stream_call(fake_odoo):
+    fake_odoo.records["res.partner"] = {
+        i: {"name": f"rec{i}"} for i in range(1, 101)
+    }
+    rows = stream_call(
+        f"{fake_odoo.url}/xmlrpc/2/object",
+        "execute_kw",
+        ("odoo", 2, "admin", "res.partner", "search_read", ([],), {}),
+        chunk_size=256,
+    )
+    assert [row["id"] for row in rows] == list(range(1, 101))
+
+
+def test_stream_call_fault(fake_odoo):
+    rows = stream_call(
+        f"{fake_odoo.url}/xmlrpc/2/object",
+        "execute_kw",
+        ("odoo", 2, "admin", "res.partner", "no_such_method", ([],), {}),
+    )
+    with pytest.raises(xmlrpc.client.Fault):
+        list(rows)
+
+
+def test_model_search_read_stream(app, fake_odoo):
+    fake_odoo.records["res.partner"] = {
+        1: {"name": "rec1"},
+        2: {"name": "rec2"},
+    }
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+
+    with app.app_context():
+        partners = Partner.search_read(stream=True)
+        records = Partner.search_read(stream=True, lightweight=True)
+    assert [p.name for p in partners] == ["rec1", "rec2"]
+    assert [r.name for r in records] == ["rec1", "rec2"]
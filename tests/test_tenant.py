@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from flask_odoo import Odoo
+from flask_odoo.tenant import Metrics, Tenant, TenantRegistry
+
+
+def test_metrics_measure():
+    metrics = Metrics()
+    with metrics.measure():
+        pass
+    with pytest.raises(ValueError):
+        with metrics.measure():
+            raise ValueError()
+    result = metrics.as_dict()
+    assert result["calls"] == 2
+    assert result["errors"] == 1
+
+
+def test_tenant_uid_is_cached(app, app_context, mocker):
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    server_proxy_mock.return_value.authenticate.return_value = 7
+    odoo = Odoo(app)
+    tenant = Tenant(odoo, "acme", "admin", "secret")
+    assert tenant.uid == 7
+    assert tenant.uid == 7
+    server_proxy_mock.return_value.authenticate.assert_called_once_with(
+        "acme", "admin", "secret", {}
+    )
+
+
+def test_tenant_uid_rejected_is_not_cached(app, app_context, mocker):
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    authenticate = server_proxy_mock.return_value.authenticate
+    authenticate.side_effect = [False, 7]
+    odoo = Odoo(app)
+    tenant = Tenant(odoo, "acme", "admin", "wrong")
+    with pytest.raises(RuntimeError):
+        tenant.uid
+    assert tenant.uid == 7
+    assert authenticate.call_count == 2
+
+
+def test_tenant_registry_lru():
+    registry = TenantRegistry(
+        lambda db, username, password: MagicMock(password=password),
+        maxsize=2,
+    )
+    acme = registry.get("acme", "admin", "secret")
+    initech = registry.get("initech", "admin", "secret")
+    assert registry.get("acme", "admin", "secret") is acme
+    registry.get("globex", "admin", "secret")
+    assert len(registry) == 2
+    initech.close.assert_called_once_with()
+    acme.close.assert_not_called()
+
+
+def test_tenant_registry_password_change():
+    registry = TenantRegistry(
+        lambda db, username, password: MagicMock(password=password)
+    )
+    old = registry.get("acme", "admin", "old")
+    new = registry.get("acme", "admin", "new")
+    assert old is not new
+    old.close.assert_called_once_with()
+
+
+def test_odoo_for_tenant(app, app_context):
+    odoo = Odoo(app)
+    tenant = odoo.for_tenant("acme", "admin", "secret")
+    assert odoo.for_tenant("acme", "admin", "secret") is tenant
+    assert odoo.tenant is None
+    with tenant:
+        assert odoo.tenant is tenant
+    assert odoo.tenant is None
+
+
+def test_odoo_tenant_loader(app, app_context):
+    odoo = Odoo(app)
+
+    @odoo.tenant_loader
+    def load_tenant():
+        return odoo.for_tenant("acme", "admin", "secret")
+
+    assert odoo.tenant is odoo.for_tenant("acme", "admin", "secret")
+
+
+def test_model_uses_bound_tenant(app, app_context, mocker):
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    server_proxy_mock.return_value.authenticate.return_value = 7
+    server_proxy_mock.return_value.execute_kw.return_value = 3
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+    tenant = odoo.for_tenant("acme", "admin", "secret")
+    with tenant:
+        assert Partner.search_count() == 3
+    server_proxy_mock.return_value.execute_kw.assert_called_with(
+        "acme", 7, "secret", "res.partner", "search_count", ([],), {}
+    )
+    assert tenant.metrics.calls == 1
@@ -0,0 +1,103 @@
+import gzip
+import time
+import xmlrpc.client
+from unittest.mock import MagicMock
+
+from flask_odoo import Odoo
+from flask_odoo.stream import stream_call
+from flask_odoo.transport import (
+    GzipDecoder,
+    SafeTransport,
+    Transport,
+    create_transport,
+)
+
+
+def test_gzip_decoder():
+    data = b"<methodResponse/>" * 100
+    compressed = gzip.compress(data)
+    decoder = GzipDecoder("gzip")
+    decoded = b"".join(
+        decoder.decode(compressed[i : i + 10])
+        for i in range(0, len(compressed), 10)
+    )
+    assert decoded + decoder.flush() == data
+    assert GzipDecoder("").decode(data) == data
+
+
+def test_create_transport():
+    transport = create_transport("http://localhost:8069", gzip_threshold=10)
+    assert isinstance(transport, Transport)
+    assert transport.accept_gzip_encoding
+    assert transport.encode_threshold == 10
+    context = MagicMock()
+    transport = create_transport("https://localhost", context=context)
+    assert isinstance(transport, SafeTransport)
+    assert transport.context is context
+
+
+def test_odoo_transport_config(app, app_context):
+    app.config["ODOO_GZIP_RESPONSES"] = False
+    app.config["ODOO_GZIP_REQUEST_THRESHOLD"] = 1400
+    odoo = Odoo(app)
+    transport = odoo.create_object_proxy()._ServerProxy__transport
+    assert not transport.accept_gzip_encoding
+    assert transport.encode_threshold == 1400
+
+
+def populate(fake_odoo, count):
+    fake_odoo.records["res.partner"] = {
+        i: {"name": f"Partner {i}", "email": f"partner{i}@example.com"}
+        for i in range(1, count + 1)
+    }
+
+
+def search_read(fake_odoo, **options):
+    transport = create_transport(fake_odoo.url, **options)
+    object = xmlrpc.client.ServerProxy(
+        f"{fake_odoo.url}/xmlrpc/2/object", transport=transport
+    )
+    start = time.process_time()
+    rows = object.execute_kw(
+        "odoo", 2, "admin", "res.partner", "search_read", [[]], {}
+    )
+    elapsed = time.process_time() - start
+    return rows, transport, elapsed
+
+
+def test_gzip_round_trip(fake_odoo):
+    populate(fake_odoo, 100)
+    plain, plain_transport, _ = search_read(fake_odoo, accept_gzip=False)
+    rows, transport, _ = search_read(
+        fake_odoo, accept_gzip=True, gzip_threshold=0
+    )
+    assert rows == plain
+    assert transport.bytes_received < plain_transport.bytes_received
+
+
+def test_stream_call_gzip(fake_odoo):
+    populate(fake_odoo, 100)
+    rows = stream_call(
+        f"{fake_odoo.url}/xmlrpc/2/object",
+        "execute_kw",
+        ("odoo", 2, "admin", "res.partner", "search_read", ([],), {}),
+        chunk_size=256,
+        accept_gzip=True,
+        gzip_threshold=0,
+    )
+    assert len(list(rows)) == 100
+
+
+def test_gzip_benchmark(fake_odoo):
+    print("\nrows    plain bytes  gzip bytes  plain cpu  gzip cpu")
+    for count in [10, 1_000, 10_000]:
+        populate(fake_odoo, count)
+        _, plain, plain_cpu = search_read(fake_odoo, accept_gzip=False)
+        _, compressed, gzip_cpu = search_read(fake_odoo, accept_gzip=True)
+        print(
+            f"{count:<7} {plain.bytes_received:>11}  "
+            f"{compressed.bytes_received:>10}  "
+            f"{plain_cpu * 1000:>7.1f}ms  {gzip_cpu * 1000:>6.1f}ms"
+        )
+        if count >= 1_000:
+            assert compressed.bytes_received * 4 < plain.bytes_received
@@ -15,6 +15,7 @@ from flask_odoo.types import (
     DictType,
     One2manyType,
     Many2oneType,
+    BinaryType,
 )
 
 
@@ -103,3 +104,15 @@ def test_many2one_type():
     assert instance.to_native(("1", "Test")) == [1, "Test"]
     assert instance.to_native(1) == [1, ""]
     assert instance.to_native("1") == [1, ""]
+
+
+def test_binary_type():
+    instance = BinaryType()
+    assert instance.to_native(False) is None
+    assert instance.to_native("aGVsbG8=\n") == b"hello"
+    assert instance.to_native(b"hello") == b"hello"
+    assert instance.to_primitive(b"hello") == "aGVsbG8="
+    with pytest.raises(schematics.exceptions.ConversionError):
+        instance.to_native("not base64!")
+    with pytest.raises(schematics.exceptions.ConversionError):
+        instance.to_native(1)
@@ -0,0 +1,176 @@
+import json
+from unittest.mock import MagicMock
+
+from flask_odoo import Odoo
+from flask_odoo.writebehind import JsonlSpool, WriteBehindQueue
+
+
+def test_jsonl_spool(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    spool = JsonlSpool(str(path))
+    assert spool.replay() == []
+    spool.append({"model": "res.partner", "id": 1, "vals": {}})
+    with open(path, "a") as file:
+        file.write('{"model": "res.par')
+    assert spool.replay() == [{"model": "res.partner", "id": 1, "vals": {}}]
+    spool.rewrite([])
+    assert spool.replay() == []
+
+
+def test_write_behind_coalesces_writes(app):
+    odoo_mock = MagicMock()
+    queue = WriteBehindQueue(odoo_mock, app)
+    # Hold the worker back until every write is queued.
+    queue._cond.acquire()
+    try:
+        queue.enqueue("res.partner", 1, {"name": "a"})
+        queue.enqueue("res.partner", 1, {"email": "a@example.com"})
+        queue.enqueue("res.partner", 2, {"name": "a"})
+        queue.enqueue("res.partner", 2, {"email": "a@example.com"})
+        assert len(queue) == 2
+    finally:
+        queue._cond.release()
+    assert queue.shutdown(timeout=5)
+    odoo_mock["res.partner"].write.assert_called_once_with(
+        [1, 2], {"name": "a", "email": "a@example.com"}
+    )
+
+
+def test_write_behind_creates_in_bulk(app):
+    odoo_mock = MagicMock()
+    odoo_mock["res.partner"].create.return_value = [10, 11]
+    queue = WriteBehindQueue(odoo_mock, app)
+    created = []
+    queue._cond.acquire()
+    try:
+        queue.enqueue("res.partner", None, {"name": "a"}, None, created.append)
+        queue.enqueue("res.partner", None, {"name": "b"}, None, created.append)
+    finally:
+        queue._cond.release()
+    assert queue.flush(timeout=5)
+    odoo_mock["res.partner"].create.assert_called_once_with(
+        [{"name": "a"}, {"name": "b"}]
+    )
+    assert created == [10, 11]
+    queue.shutdown(timeout=5)
+
+
+def test_write_behind_retries_connection_errors(app):
+    odoo_mock = MagicMock()
+    odoo_mock["res.partner"].write.side_effect = [ConnectionRefusedError, 1]
+    queue = WriteBehindQueue(odoo_mock, app, retry_delay=0)
+    queue.enqueue("res.partner", 1, {"name": "a"})
+    assert queue.shutdown(timeout=5)
+    assert odoo_mock["res.partner"].write.call_count == 2
+
+
+def test_write_behind_recovers_spool(app, tmp_path):
+    path = tmp_path / "spool.jsonl"
+    with open(path, "w") as file:
+        for name in ["a", "b"]:
+            entry = {
+                "model": "res.partner",
+                "id": 1,
+                "vals": {"name": name},
+                "tenant": None,
+            }
+            file.write(json.dumps(entry) + "\n")
+    odoo_mock = MagicMock()
+    queue = WriteBehindQueue(odoo_mock, app, spool=JsonlSpool(str(path)))
+    queue.enqueue("res.partner", 2, {"name": "c"})
+    assert queue.shutdown(timeout=5)
+    odoo_mock["res.partner"].write.assert_any_call([1], {"name": "b"})
+    odoo_mock["res.partner"].write.assert_any_call([2], {"name": "c"})
+    assert path.read_text() == ""
+
+
+def test_write_behind_resumes_parked_tenant(app, fake_odoo, tmp_path):
+    path = tmp_path / "spool.jsonl"
+    entry = {
+        "model": "res.partner",
+        "id": 1,
+        "vals": {"name": "b"},
+        "tenant": ["acme", "admin"],
+    }
+    path.write_text(json.dumps(entry) + "\n")
+    app.config["ODOO_WRITE_BEHIND_SPOOL"] = str(path)
+    fake_odoo.records["res.partner"] = {1: {"name": "a"}, 2: {"name": "a"}}
+    odoo = Odoo(app)
+    with app.app_context():
+        odoo.enqueue("res.partner", 2, {"name": "c"})
+        assert odoo.flush(timeout=5)
+        # The tenant is not known after a restart, its write is kept.
+        assert fake_odoo.records["res.partner"][1]["name"] == "a"
+        assert json.loads(path.read_text()) == entry
+        odoo.for_tenant("acme", "admin", "admin")
+        assert odoo.flush(timeout=5)
+        odoo.write_behind.shutdown(timeout=5)
+    assert fake_odoo.records["res.partner"][1]["name"] == "b"
+    assert fake_odoo.records["res.partner"][2]["name"] == "c"
+    assert path.read_text() == ""
+
+
+def test_model_create_or_update_deferred(app, mocker):
+    server_proxy_mock = mocker.patch("xmlrpc.client.ServerProxy")
+    server_proxy_mock.return_value.authenticate.return_value = 1
+    server_proxy_mock.return_value.execute_kw.return_value = [5]
+    odoo = Odoo(app)
+
+    class Partner(odoo.Model):
+        _name = "res.partner"
+
+        name = odoo.StringType()
+
+    with app.app_context():
+        partner = Partner()
+        partner.name = "test_partner"
+        partner.create_or_update(deferred=True)
+        assert odoo.flush(timeout=5)
+        odoo.write_behind.shutdown(timeout=5)
+    assert partner.id == 5
+    server_proxy_mock.return_value.execute_kw.assert_called_with(
+        "odoo",
+        1,
+        "admin",
+        "res.partner",
+        "create",
+        ([{"name": "test_partner"}],),
+        {},
+    )
+
+
+def test_write_behind_retries_failed_calls_only(app, tmp_path):
+    spool = JsonlSpool(str(tmp_path / "spool.jsonl"))
+    odoo_mock = MagicMock()
+    odoo_mock["res.partner"].create.return_value = [10]
+    spooled = []
+
+    def write(ids, vals):
+        if not spooled:
+            spooled.append(spool.replay())
+            raise ConnectionRefusedError
+        spooled.append(spool.replay())
+        return True
+
+    odoo_mock["res.partner"].write.side_effect = write
+    queue = WriteBehindQueue(odoo_mock, app, spool=spool, retry_delay=0)
+    queue._cond.acquire()
+    try:
+        queue.enqueue("res.partner", None, {"name": "a"})
+        queue.enqueue("res.partner", 1, {"name": "b"})
+    finally:
+        queue._cond.release()
+    assert queue.shutdown(timeout=5)
+    odoo_mock["res.partner"].create.assert_called_once_with([{"name": "a"}])
+    assert odoo_mock["res.partner"].write.call_count == 2
+    # The applied create is no longer spooled when the write is retried.
+    assert len(spooled[0]) == 2
+    assert spooled[1] == [
+        {
+            "model": "res.partner",
+            "id": 1,
+            "vals": {"name": "b"},
+            "tenant": None,
+        }
+    ]
+    assert spool.replay() == []